@@ -0,0 +1,58 @@
+"""
+┌────────────────────────────────┐
+│ Stacked effects on a large rig │
+└────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import time
+
+from tests_dumb            import MyMovingHead
+
+from pyshow.dmx.render     import Show_Renderer, DMX_Controller_Null
+from pyshow.core.scenes    import Scene
+from pyshow.core.fixtures  import Fixture_Group
+from pyshow.core.effects   import (
+    effect_sine,
+    effect_chase,
+    effect_rainbow,
+    effect_circle
+)
+
+
+def build(fixture_count: int):
+    transport = DMX_Controller_Null(universes=(fixture_count*8 + 511)//512)
+    rig       = Fixture_Group([
+        MyMovingHead(transport=transport, channel_start=(i%64)*8, universe=i//64)
+        for i in range(fixture_count)
+    ])
+
+    # One-liners, stacked
+    scene     = Scene(functions=[
+        effect_sine   (rig["dimmer"], rate_hz=0.5, low=0.2),
+        effect_chase  (rig["color.b"], rate_hz=2.0, width=0.1),
+        effect_rainbow(rig[::2]["color"], rate_hz=0.1),
+        effect_circle (rig["pos"], rate_hz=0.25, spread=0.5),
+    ])
+
+    return transport, rig, scene
+
+
+if __name__ == "__main__":
+    for fixture_count in (64, 512):
+        transport, rig, scene = build(fixture_count)
+
+        renderer = Show_Renderer(transport, [scene], rate_hz=44.0)
+        scene.trigger()
+
+        t_start  = time.perf_counter()
+        frames   = renderer.render(10.0)
+        t        = (time.perf_counter() - t_start)/len(frames)
+
+        print(f"{fixture_count:4d} fixtures, {len(scene.functions)} effects: {t*1e3:6.3f} ms/tick")
+
+    # At trigger time, first fixture dimmer is at the low point (20%), and its
+    # color at the start of the rainbow (red).
+    assert frames[0][:4].tolist() == [51, 255, 0, 0]
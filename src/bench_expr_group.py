@@ -0,0 +1,70 @@
+"""
+┌────────────────────────────────────────────┐
+│ Micro benchmark for group expression waves │
+└────────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import asyncio
+import math
+import time
+
+import numpy as np
+
+from tests_dumb            import patch
+
+from pyshow.core.scenes    import Scene
+from pyshow.core.functions import Function_Animation_Expr, Function_Animation_Expr_Group
+
+
+# ┌────────────────────────────────────────┐
+# │ Wave on dimmers                        │
+# └────────────────────────────────────────┘
+
+def build(fixture_count: int, group: bool):
+    transport, fixtures = patch(fixture_count)
+    dimmers             = [fixture.interfaces["dimmer"] for fixture in fixtures]
+    phases              = [2*math.pi*i/fixture_count for i in range(fixture_count)]
+
+    if group:
+        functions = [Function_Animation_Expr_Group(dimmers, phase=phases,
+            expr=lambda fkt, t, idx, phase, pos: 50.0 + 50.0*np.sin(2*math.pi*t + phase))
+        ]
+
+    else:
+        functions = [
+            Function_Animation_Expr(itf,
+                expr=lambda fkt, t, phase=phase: 50.0 + 50.0*math.sin(2*math.pi*t + phase))
+            for itf, phase in zip(dimmers, phases)
+        ]
+
+    return transport, Scene(functions)
+
+
+async def bench(scene, count: int = 440):
+    scene.trigger()
+
+    t_start = time.perf_counter()
+    for i in range(count):
+        await scene.update(i/44.0)
+
+    return (time.perf_counter() - t_start) / count
+
+
+# ┌────────────────────────────────────────┐
+# │ Benchmark                              │
+# └────────────────────────────────────────┘
+
+if __name__ == "__main__":
+    for fixture_count in (200, 2000):
+        frames = []
+        for group in (False, True):
+            transport, scene = build(fixture_count, group)
+            t                = asyncio.run(bench(scene))
+            frames.append(bytes(transport.frame))
+
+            print(f"{fixture_count:5d} fixtures, {'group' if group else 'scalar'}: {t*1e3:7.3f} ms/tick")
+
+        print("Same output:", frames[0] == frames[1])
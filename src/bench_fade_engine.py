@@ -0,0 +1,70 @@
+"""
+┌─────────────────────────────────────┐
+│ Micro benchmark for DMX fade engine │
+└─────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import asyncio
+import time
+
+from tests_dumb                 import patch
+
+from pyshow.dmx.fade_engine     import Fade_Engine_DMX
+from pyshow.core.scenes         import Scene
+from pyshow.core.functions      import Function_Fade
+from pyshow.core.curves         import CURVE_S
+from pyshow.core.clock          import Clock_Virtual
+
+
+# ┌────────────────────────────────────────┐
+# │ Scene with a lot of fades              │
+# └────────────────────────────────────────┘
+
+def build(fixture_count: int, use_engine: bool, curve = None):
+    transport, fixtures = patch(fixture_count)
+    engine              = Fade_Engine_DMX(transport) if use_engine else None
+
+    functions = []
+    for fixture in fixtures:
+        itfs    = [fixture.interfaces["dimmer"]] + [
+            getattr(fixture.interfaces["color"], name) for name in "rgb"
+        ]
+
+        functions += [
+            Function_Fade(target=itf.max, fade_time_s=100.0, interface=itf, curve=curve, engine=engine)
+            for itf in itfs
+        ]
+
+    return Scene(functions, clock=Clock_Virtual()), engine
+
+
+async def bench(scene, engine, count: int = 200):
+    # Updates are stamped by the scene clock, like fade triggers
+    clock   = scene.clock
+    scene.trigger()
+
+    t_start = time.perf_counter()
+    for i in range(count):
+        clock.advance(1/44.0)
+        tstamp = clock.now()
+        await scene.update(tstamp)
+        if engine is not None:
+            engine.step(tstamp)
+
+    return (time.perf_counter() - t_start) / count
+
+
+# ┌────────────────────────────────────────┐
+# │ Benchmark                              │
+# └────────────────────────────────────────┘
+
+if __name__ == "__main__":
+    for use_engine in (False, True):
+        for curve in (None, CURVE_S):
+            scene, engine = build(128, use_engine, curve)
+            t             = asyncio.run(bench(scene, engine))
+            name          = f"{'engine' if use_engine else 'scalar'}, {curve.name if curve else 'linear'}"
+            print(f"{name:16s}: {len(scene.functions)} fades, {t*1e3:6.3f} ms/tick")
@@ -0,0 +1,46 @@
+"""
+┌───────────────────────────────────────┐
+│ Micro benchmark for fixture group set │
+└───────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import time
+
+from tests_dumb            import patch
+
+from pyshow.core.fixtures  import Fixture_Group
+
+
+def bench(fkt, count: int = 200):
+    t_start = time.perf_counter()
+    for i in range(count):
+        fkt(i)
+
+    return (time.perf_counter() - t_start) / count
+
+
+if __name__ == "__main__":
+    for fixture_count in (200, 2000):
+        transport, fixtures = patch(fixture_count)
+        group               = Fixture_Group(fixtures)
+        dimmers             = group["dimmer"]
+        reds                = group["color.r"]
+
+        def loop(i):
+            for fixture in fixtures:
+                fixture.interfaces["dimmer"].set(i % 100)
+                fixture.interfaces["color"].r.set(1.0)
+
+        def bulk(i):
+            dimmers.set_all(i % 100)
+            reds.set_all(1.0)
+
+        t_loop = bench(loop)
+        frame  = bytes(transport.frame)
+        t_bulk = bench(bulk)
+
+        print(f"{fixture_count:5d} fixtures: loop {t_loop*1e3:6.3f} ms, group {t_bulk*1e3:6.3f} ms, "
+              f"same output: {frame == bytes(transport.frame)}")
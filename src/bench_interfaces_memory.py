@@ -0,0 +1,94 @@
+"""
+┌─────────────────────────────────────────┐
+│ Memory benchmark for fixture interfaces │
+└─────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import gc
+import timeit
+import tracemalloc
+
+from dataclasses            import fields
+
+from tests_dumb             import MyMovingHead, patch
+
+from pyshow.core.interfaces import BaseValue, GroupValue
+from pyshow.dmx.controller  import DMX_UNIVERSE_SIZE
+from pyshow.dmx.render      import DMX_Controller_Null
+
+
+FIXTURE_CHANNELS = 8
+FIXTURE_COUNT    = 2000
+
+
+# ┌────────────────────────────────────────┐
+# │ Baseline layout                        │
+# └────────────────────────────────────────┘
+
+# Interfaces used to be plain dataclasses: fields and private state (fixture and
+# value) were held in an instance dict, and outputs were resolved through the
+# fixture on each set. Copies with this layout are compared to the current one.
+
+_LEGACY_CLASSES = dict()
+
+def legacy_copy(itf: BaseValue, fixt):
+    cls = _LEGACY_CLASSES.get(type(itf))
+    if cls is None:
+        cls = _LEGACY_CLASSES[type(itf)] = type(f"Legacy_{type(itf).__name__}", (), {})
+
+    out = cls()
+    for f in fields(itf):
+        v = getattr(itf, f.name)
+        setattr(out, f.name, legacy_copy(v, fixt) if isinstance(v, BaseValue) else v)
+
+    if isinstance(itf, GroupValue):
+        out._GroupValue__fixture  = fixt
+    else:
+        out._AtomicValue__fixture = fixt
+        out._value                = itf.get()
+
+    return out
+
+
+def traced():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+# ┌────────────────────────────────────────┐
+# │ Benchmark                              │
+# └────────────────────────────────────────┘
+
+if __name__ == "__main__":
+    universes = (FIXTURE_COUNT*FIXTURE_CHANNELS + DMX_UNIVERSE_SIZE-1) // DMX_UNIVERSE_SIZE
+    transport = DMX_Controller_Null(universes=universes) # Not measured
+
+    # Traced all along, so that freed interfaces are accounted for
+    tracemalloc.start()
+    mem_start   = traced()
+
+    _, fixtures = patch(FIXTURE_COUNT, MyMovingHead, FIXTURE_CHANNELS, transport)
+    mem         = traced() - mem_start
+
+    # Same patch, interfaces replaced by copies in the baseline layout
+    for fixt in fixtures:
+        fixt.interfaces = {name: legacy_copy(itf, fixt) for name, itf in fixt.interfaces.items()}
+
+    mem_legacy  = traced() - mem_start
+    tracemalloc.stop()
+
+    print(f"{FIXTURE_COUNT} fixtures: {mem/1024:8.1f} KiB, {mem/FIXTURE_COUNT:6.0f} bytes/fixture")
+    print(f"baseline layout: {mem_legacy/1024:8.1f} KiB, {mem_legacy/FIXTURE_COUNT:6.0f} bytes/fixture, "
+          f"current is {100*mem/mem_legacy:5.1f}% of baseline")
+
+    # Hot path attribute access
+    _, fixtures = patch(1, MyMovingHead, FIXTURE_CHANNELS, transport)
+    itf         = fixtures[0].interfaces["color"].r
+    count       = 200000
+    t_set       = min(timeit.repeat(lambda: itf.set(0.5), number=count, repeat=5)) / count
+    t_get       = min(timeit.repeat(lambda: (itf.min, itf.max, itf.invert), number=count, repeat=5)) / count
+
+    print(f"set: {t_set*1e9:6.1f} ns, attributes access: {t_get*1e9:6.1f} ns")
@@ -0,0 +1,58 @@
+"""
+┌─────────────────────────────────────────────┐
+│ Micro benchmark for slow periodic functions │
+└─────────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import asyncio
+import time
+
+from tests_dumb            import patch
+
+from pyshow.core.scenes    import Scene
+from pyshow.core.functions import Function_Periodic_Expr, Function_Delay
+
+
+# ┌────────────────────────────────────────┐
+# │ Scene with a lot of chase steps        │
+# └────────────────────────────────────────┘
+
+def build(fixture_count: int):
+    transport, fixtures = patch(fixture_count)
+
+    # Chase steps and strobes, from 2Hz down to one step every 4s
+    functions = [
+        Function_Periodic_Expr(interface=itf, period_s=0.5*(1 + i%8),
+            expr=lambda fkt, t: 0.0 if int(t/fkt.period_s) % 2 else fkt.interface.max)
+
+        for i, fixture in enumerate(fixtures)
+        for itf in (fixture.interfaces["dimmer"], fixture.interfaces["color"].r)
+    ]
+
+    functions += [Function_Delay(delay_s=60.0) for i in range(fixture_count)]
+
+    return Scene(functions)
+
+
+async def bench(scene, rate_hz: float = 44.0, count: int = 44*20):
+    scene.trigger()
+
+    t_start = time.perf_counter()
+    for i in range(count):
+        await scene.update(i/rate_hz)
+
+    return (time.perf_counter() - t_start) / count
+
+
+# ┌────────────────────────────────────────┐
+# │ Benchmark                              │
+# └────────────────────────────────────────┘
+
+if __name__ == "__main__":
+    for fixture_count in (128, 1024, 4096):
+        scene = build(fixture_count)
+        t     = asyncio.run(bench(scene))
+        print(f"{fixture_count:5d} fixtures: {len(scene.functions)} functions, {t*1e3:7.3f} ms/tick")
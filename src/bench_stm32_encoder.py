@@ -0,0 +1,60 @@
+"""
+┌─────────────────────────────────────────┐
+│ Micro benchmark for STM32 frame encoder │
+└─────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import timeit
+
+from pyshow.dmx.controller import DMX_UNIVERSE_SIZE
+from pyshow.dmx.stm32dmx   import (
+    DMX_STM32_Cmd,
+    DMX_STM32_Msg,
+    DMX_STM32_Encoder
+)
+
+
+# ┌────────────────────────────────────────┐
+# │ Encoding functions                     │
+# └────────────────────────────────────────┘
+
+frame = bytes(i&0xFF for i in range(DMX_UNIVERSE_SIZE))
+
+def encode_concat():
+    # Former implementation: bytes concatenation for each channel
+    buffer = bytes()
+    for ch in range(DMX_UNIVERSE_SIZE):
+        cmd     = DMX_STM32_Msg(cmd=DMX_STM32_Cmd.CH_SET, value0=ch, value1=frame[ch]).to_bytes()
+        buffer += bytes([cmd[0] | 0x80]) + cmd[1:] + bytes([0xFF])
+    return buffer
+
+
+encoder = DMX_STM32_Encoder()
+
+def encode_in_place():
+    encoder.reset()
+    for ch in range(DMX_UNIVERSE_SIZE):
+        encoder.ch_set(ch, frame[ch])
+    return encoder.view()
+
+
+def encode_frame_set():
+    encoder.reset()
+    encoder.frame_set(frame)
+    return encoder.view()
+
+
+# ┌────────────────────────────────────────┐
+# │ Benchmark                              │
+# └────────────────────────────────────────┘
+
+if __name__ == "__main__":
+    assert encode_concat() == bytes(encode_in_place())
+
+    count = 200
+    for fkt in (encode_concat, encode_in_place, encode_frame_set):
+        t = min(timeit.repeat(fkt, number=count, repeat=5)) / count
+        print(f"{fkt.__name__:20s}: {t*1e6:8.1f} µs/frame, {len(fkt()):5d} bytes")
@@ -0,0 +1,74 @@
+"""
+┌────────────┐
+│ Show clock │
+└────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import time
+
+
+# ┌────────────────────────────────────────┐
+# │ Clock base class                       │
+# └────────────────────────────────────────┘
+
+class Clock:
+    """
+    Time source of a show, in seconds. Functions stamp their triggers with it,
+    and the runner gives its timestamps to updates, so that both agree.
+
+    Only differences between timestamps are meaningful.
+    """
+
+    realtime = True # False if time does not flow by itself
+
+    def now(self):
+        raise NotImplementedError
+
+
+# ┌────────────────────────────────────────┐
+# │ Monotonic clock                        │
+# └────────────────────────────────────────┘
+
+class Clock_Monotonic(Clock):
+    """
+    Uses time.monotonic(), which is also the clock of the default asyncio event
+    loop. Unlike time.time(), it does not jump when the system time is set.
+    """
+
+    def now(self):
+        return time.monotonic()
+
+
+# ┌────────────────────────────────────────┐
+# │ Virtual clock                          │
+# └────────────────────────────────────────┘
+
+class Clock_Virtual(Clock):
+    """
+    Clock that only moves when set or advanced, for instance by the runner at
+    each tick. Lets a show run faster (or slower) than real time.
+    """
+
+    realtime = False
+
+    def __init__(self, tstamp: float = 0.0):
+        self.tstamp = tstamp
+
+    def now(self):
+        return self.tstamp
+
+    def set(self, tstamp: float):
+        self.tstamp = tstamp
+
+    def advance(self, dt: float):
+        self.tstamp += dt
+
+
+# ┌────────────────────────────────────────┐
+# │ Default clock                          │
+# └────────────────────────────────────────┘
+
+CLOCK_MONOTONIC = Clock_Monotonic()
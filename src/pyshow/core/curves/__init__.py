@@ -0,0 +1,154 @@
+"""
+┌─────────────┐
+│ Fade curves │
+└─────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import math
+
+from functools import lru_cache
+from typing    import Callable
+
+
+# ┌────────────────────────────────────────┐
+# │ Constants                              │
+# └────────────────────────────────────────┘
+
+CURVE_LUT_SIZE = 1025 # Samples on [0;1], including both ends
+
+
+# ┌────────────────────────────────────────┐
+# │ Curve class                            │
+# └────────────────────────────────────────┘
+
+class Curve:
+    """
+    Fade curve mapping the fade progress in [0;1] to the value progress, usually
+    in [0;1] too. The curve function is sampled once into a lookup table, and
+    evaluating the curve is a linear interpolation between two samples.
+
+    Curves are shared: use the module constants and factory functions, which
+    cache their tables.
+    """
+
+    __slots__ = ("name", "lut", "_scale")
+
+    def __init__(self, name: str, fkt: Callable[[float], float], size: int = CURVE_LUT_SIZE):
+        if size < 2:
+            raise ValueError(f"Invalid lookup table size: {size}")
+
+        self.name   = name
+        self.lut    = tuple(float(fkt(i/(size-1))) for i in range(size))
+        self._scale = size-1
+
+    def __call__(self, x: float):
+        lut = self.lut
+        if   x <= 0.0: return lut[0]
+        elif x >= 1.0: return lut[-1]
+
+        pos = x*self._scale
+        idx = int(pos)
+        y0  = lut[idx]
+
+        return y0 + (lut[idx+1]-y0)*(pos-idx)
+
+    def __repr__(self):
+        return f"Curve({self.name})"
+
+
+# ┌────────────────────────────────────────┐
+# │ Curve functions                        │
+# └────────────────────────────────────────┘
+
+def _exponential(x: float, k: float):
+    return math.expm1(k*x)/math.expm1(k)
+
+
+def _bezier(t: float, p1: float, p2: float):
+    # 1D cubic Bézier with P0=0 and P3=1
+    u = 1.0-t
+    return 3*u*u*t*p1 + 3*u*t*t*p2 + t*t*t
+
+
+def _bezier_solve(x: float, x1: float, x2: float):
+    # Bézier parameter giving x, by bisection (x is monotonic for x1, x2 in [0;1])
+    t_lo, t_hi = 0.0, 1.0
+    for i in range(40):
+        t = (t_lo+t_hi)/2
+        if _bezier(t, x1, x2) < x: t_lo = t
+        else:                      t_hi = t
+
+    return (t_lo+t_hi)/2
+
+
+# ┌────────────────────────────────────────┐
+# │ Curves                                 │
+# └────────────────────────────────────────┘
+
+CURVE_LINEAR      = Curve("linear",      lambda x: x)
+CURVE_EASE_IN     = Curve("ease_in",     lambda x: x*x*x)
+CURVE_EASE_OUT    = Curve("ease_out",    lambda x: 1-(1-x)**3)
+CURVE_EASE_IN_OUT = Curve("ease_in_out", lambda x: 4*x*x*x if x < 0.5 else 1-((-2*x+2)**3)/2)
+CURVE_S           = Curve("s_curve",     lambda x: x*x*x*(x*(6*x-15)+10)) # Smootherstep
+CURVE_EXPONENTIAL = Curve("exponential", lambda x: _exponential(x, 5.0))
+
+
+@lru_cache(maxsize=None)
+def curve_exponential(k: float):
+    """
+    Exponential curve, steeper for higher k. Negative k gives a logarithmic
+    looking curve.
+    """
+
+    if k == 0:
+        return CURVE_LINEAR
+    return Curve(f"exponential({k})", lambda x: _exponential(x, k))
+
+
+@lru_cache(maxsize=None)
+def curve_step(at: float = 1.0):
+    """
+    Jumps from start to target value when progress reaches at. The jump is
+    spread over one lookup table interval.
+    """
+
+    if (at < 0.0) or (at > 1.0):
+        raise ValueError(f"Invalid step position: {at}")
+    return Curve(f"step({at})", lambda x: 1.0 if x >= at else 0.0)
+
+
+@lru_cache(maxsize=None)
+def curve_cubic_bezier(x1: float, y1: float, x2: float, y2: float):
+    """
+    Cubic Bézier curve from (0,0) to (1,1) with control points (x1,y1) and
+    (x2,y2), like CSS cubic-bezier(). y1 and y2 may overshoot [0;1].
+    """
+
+    if not ((0.0 <= x1 <= 1.0) and (0.0 <= x2 <= 1.0)):
+        raise ValueError("Bézier control points x must be in [0;1]")
+
+    return Curve(f"cubic_bezier({x1}, {y1}, {x2}, {y2})",
+        lambda x: _bezier(_bezier_solve(x, x1, x2), y1, y2)
+    )
+
+
+CURVES = {curve.name: curve for curve in (
+    CURVE_LINEAR,
+    CURVE_EASE_IN,
+    CURVE_EASE_OUT,
+    CURVE_EASE_IN_OUT,
+    CURVE_S,
+    CURVE_EXPONENTIAL,
+)}
+
+CURVES["step"] = curve_step()
+
+
+def curve_get(name: str):
+    try:
+        return CURVES[name]
+    except KeyError:
+        raise KeyError(f"No such curve: {name}")
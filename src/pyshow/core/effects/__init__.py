@@ -0,0 +1,223 @@
+"""
+┌───────────────────┐
+│ Effect generators │
+└───────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import colorsys
+import math
+
+import numpy as np
+
+from functools              import lru_cache
+from typing                 import Callable, List, Union
+
+from pyshow.core.clock      import Clock
+from pyshow.core.fixtures   import Interface_Group
+from pyshow.core.functions  import Function_Animation
+from pyshow.core.interfaces import BaseValue, GroupValue
+
+
+# ┌────────────────────────────────────────┐
+# │ Constants                              │
+# └────────────────────────────────────────┘
+
+WAVE_TABLE_SIZE = 1024 # Samples over one period
+
+
+# ┌────────────────────────────────────────┐
+# │ Wavetable class                        │
+# └────────────────────────────────────────┘
+
+class Wavetable:
+    """
+    Periodic waveform mapping a phase, in cycles, to one value per column, in
+    [0;1]: one column for a dimmer wave, three for a color, two for a pan/tilt
+    position. The function is sampled once over one period, and sampling the
+    table is a linear interpolation between two samples, for a whole array of
+    phases at once.
+
+    Tables are shared: use the module constants and factory functions, which
+    cache them.
+    """
+
+    __slots__ = ("name", "table", "columns")
+
+    def __init__(self, name: str, fkt: Callable[[float], any], size: int = WAVE_TABLE_SIZE):
+        if size < 2:
+            raise ValueError(f"Invalid wavetable size: {size}")
+
+        table = np.array([fkt(i/size) for i in range(size)], dtype=float).reshape(size, -1)
+
+        self.name    = name
+        self.table   = np.concatenate((table, table[:1])) # First sample again, to wrap around
+        self.columns = table.shape[1]
+
+    def __len__(self):
+        return len(self.table)-1
+
+    def sample(self, phase: np.ndarray):
+        """
+        Returns a (len(phase), columns) array of values
+        """
+
+        pos  = np.mod(phase, 1.0)*len(self)
+        idx  = np.minimum(pos.astype(np.intp), len(self)-1)
+        frac = (pos-idx)[:, None]
+
+        y0   = self.table[idx]
+        return y0 + (self.table[idx+1]-y0)*frac
+
+    def __repr__(self):
+        return f"Wavetable({self.name})"
+
+
+# ┌────────────────────────────────────────┐
+# │ Waveforms                              │
+# └────────────────────────────────────────┘
+
+def _circle(x: float):
+    return (0.5 + 0.5*math.cos(2*math.pi*x), 0.5 + 0.5*math.sin(2*math.pi*x))
+
+
+def _figure_8(x: float):
+    # Lissajous curve, tilt going twice as fast as pan
+    return (0.5 + 0.5*math.sin(2*math.pi*x), 0.5 + 0.5*math.sin(4*math.pi*x))
+
+
+WAVE_SINE     = Wavetable("sine",     lambda x: 0.5 - 0.5*math.cos(2*math.pi*x)) # Starts at 0
+WAVE_TRIANGLE = Wavetable("triangle", lambda x: 1.0 - abs(2*x - 1.0))
+WAVE_SAW      = Wavetable("saw",      lambda x: x)
+WAVE_RAINBOW  = Wavetable("rainbow",  lambda x: colorsys.hsv_to_rgb(x, 1.0, 1.0))
+WAVE_CIRCLE   = Wavetable("circle",   _circle)
+WAVE_FIGURE_8 = Wavetable("figure_8", _figure_8)
+
+
+@lru_cache(maxsize=None)
+def wave_chase(width: float = 0.25):
+    """
+    Pulse at 1 during the first width of the period, 0 otherwise.
+    """
+
+    if (width <= 0.0) or (width > 1.0):
+        raise ValueError(f"Invalid chase width: {width}")
+    return Wavetable(f"chase({width})", lambda x: 1.0 if x < width else 0.0)
+
+
+# ┌────────────────────────────────────────┐
+# │ Function_Effect class                  │
+# └────────────────────────────────────────┘
+
+class Function_Effect(Function_Animation):
+    """
+    Plays a wavetable on a group of interfaces. Member i of n reads the table at
+    phase:
+
+        rate_hz*(t-t_trigger) + phase - spread*i/n
+
+    so that with spread=1, members are spread over a whole period and the wave
+    travels from the first member to the last. With spread=0, they play in
+    sync. Table values in [0;1] are mapped to [low;high], in fractions
+    of the interfaces ranges. Group interfaces (colors, positions) take one
+    table column per child.
+
+    The table is sampled once per update for the whole group, and values are
+    written at once through the group.
+    """
+
+    def __init__(self, group: Union[Interface_Group, List[BaseValue]], wave: Wavetable,
+        rate_hz: float = 1.0, spread: float = 1.0, phase: float = 0.0,
+        low: float = 0.0, high: float = 1.0, clock: Clock = None):
+
+        super().__init__(clock=clock)
+
+        self.group   = group if isinstance(group, Interface_Group) else Interface_Group(group)
+        self.wave    = wave
+
+        self.rate_hz = rate_hz
+        self.spread  = spread
+        self.phase   = phase
+        self.low     = low
+        self.high    = high
+
+        self._outputs = self.group.children() if isinstance(self.group[0], GroupValue) else (self.group,)
+        if len(self._outputs) != wave.columns:
+            raise ValueError(f"{wave} has {wave.columns} columns, interfaces need {len(self._outputs)}")
+
+        # Range of each output, per member
+        self._min     = np.array([[itf.min for itf in out] for out in self._outputs], dtype=float).T
+        self._span    = np.array([[itf.max for itf in out] for out in self._outputs], dtype=float).T - self._min
+
+        self._lag     = np.arange(len(self.group))/len(self.group)
+        self._t_start = 0.0
+
+    @property
+    def interfaces(self):
+        return self.group.interfaces
+
+    def trigger(self):
+        self._t_start = self.clock.now()
+        super().trigger()
+
+    def _compute_value(self, timestamp: float):
+        phase = self.rate_hz*(timestamp-self._t_start) + self.phase - self.spread*self._lag
+        w     = self.low + (self.high-self.low)*self.wave.sample(phase)
+
+        return self._min + self._span*w
+
+    def _apply(self, v, timestamp: float):
+        for col, out in enumerate(self._outputs):
+            out.set_array(v[:, col], clip=True) # Offsets may push values out of range
+
+        self.dirty.set()
+
+
+# ┌────────────────────────────────────────┐
+# │ Effects                                │
+# └────────────────────────────────────────┘
+
+def effect_sine(group, rate_hz: float = 1.0, spread: float = 1.0, low: float = 0.0, high: float = 1.0):
+    """
+    Sine wave, for instance on dimmers
+    """
+
+    return Function_Effect(group, WAVE_SINE, rate_hz=rate_hz, spread=spread, low=low, high=high)
+
+
+def effect_chase(group, rate_hz: float = 1.0, width: float = None, spread: float = 1.0):
+    """
+    One member on at a time by default, or a pulse of given width in periods
+    """
+
+    width = width or 1.0/len(group)
+    return Function_Effect(group, wave_chase(width), rate_hz=rate_hz, spread=spread)
+
+
+def effect_rainbow(group, rate_hz: float = 0.1, spread: float = 1.0):
+    """
+    Hue rotation on color interfaces
+    """
+
+    return Function_Effect(group, WAVE_RAINBOW, rate_hz=rate_hz, spread=spread)
+
+
+def effect_circle(group, rate_hz: float = 0.25, spread: float = 0.0, size: float = 0.5):
+    """
+    Circle on rotation interfaces, of size given as a fraction of the pan and
+    tilt ranges, around their middle.
+    """
+
+    return Function_Effect(group, WAVE_CIRCLE, rate_hz=rate_hz, spread=spread,
+        low=0.5-size/2, high=0.5+size/2)
+
+
+def effect_figure_8(group, rate_hz: float = 0.25, spread: float = 0.0, size: float = 0.5):
+    """
+    Figure 8 on rotation interfaces, like effect_circle
+    """
+
+    return Function_Effect(group, WAVE_FIGURE_8, rate_hz=rate_hz, spread=spread,
+        low=0.5-size/2, high=0.5+size/2)
@@ -8,10 +8,19 @@
 """
 
 
-from dataclasses import dataclass, field
-from copy        import deepcopy
+import numpy as np
 
-from typing      import Dict
+from dataclasses            import dataclass, field, fields
+from copy                   import deepcopy
+
+from typing                 import Dict, List
+
+from pyshow.core.interfaces import (
+    BaseValue,
+    GroupValue,
+    RangeValue,
+    RangeValue_Array
+)
 
 
 # ┌────────────────────────────────────────┐
@@ -29,3 +38,179 @@ class Fixture:
         # Associate fixture with interfaces
         for itf_name, itf in self.interfaces.items():
             itf.fixture = self
+
+
+# ┌────────────────────────────────────────┐
+# │ Interface_Group class                  │
+# └────────────────────────────────────────┘
+
+class Interface_Group:
+    """
+    Interfaces sharing the same name on several fixtures, set together.
+
+    Range interfaces are written at once through a RangeValue_Array, resolved
+    when the group is built: values, plus the per member offsets, are checked
+    against the interfaces ranges like RangeValue.set() does, unless clipping
+    is asked, and scattered to the outputs. Children of group interfaces (like
+    color.r) are interface groups too, and values of group interfaces are given
+    as tuples, in children order.
+    """
+
+    def __init__(self, interfaces: List[BaseValue]):
+        self.interfaces = list(interfaces)
+        self._children  = dict()
+        self._array     = None
+        self._offsets   = None
+
+        if not self.interfaces:
+            raise ValueError("Empty interface group")
+
+        if all(isinstance(itf, RangeValue) for itf in self.interfaces):
+            self._array   = RangeValue_Array(self.interfaces)
+            self._offsets = np.zeros(len(self.interfaces))
+
+    # ─────────────── Members ──────────────── #
+
+    def __len__(self):
+        return len(self.interfaces)
+
+    def __iter__(self):
+        return iter(self.interfaces)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return Interface_Group(self.interfaces[idx]) # Raises if empty
+        return self.interfaces[idx]
+
+    def __getattr__(self, name: str):
+        # Children groups, for instance color.r
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if name not in self._children:
+            if not all(isinstance(itf, GroupValue) for itf in self.interfaces):
+                raise AttributeError(f"No such child interface: {name}")
+
+            self._children[name] = Interface_Group([getattr(itf, name) for itf in self.interfaces])
+
+        return self._children[name]
+
+    def children(self):
+        itf   = self.interfaces[0]
+        names = itf._children or tuple(
+            f.name for f in fields(itf) if isinstance(getattr(itf, f.name), BaseValue)
+        )
+
+        return tuple(getattr(self, name) for name in names)
+
+    # ─────────────── Offsets ──────────────── #
+
+    @property
+    def offsets(self):
+        return self._offsets
+
+    @offsets.setter
+    def offsets(self, offsets):
+        if self._array is None:
+            raise TypeError("Offsets are only supported for range interfaces")
+
+        offsets = np.asarray(offsets, dtype=float)
+        if offsets.shape != (len(self.interfaces),):
+            raise ValueError(f"Expected {len(self.interfaces)} offsets, got shape {offsets.shape}")
+
+        self._offsets = offsets
+
+    # ─────────────── Set / Get ────────────── #
+
+    def set_all(self, v, clip: bool = False):
+        """
+        Sets the same value on all members. Out of range values raise
+        ValueError, or are clipped to the ranges if clip is set.
+        """
+
+        if self._array is not None:
+            self._set(v + self._offsets, clip)
+        elif isinstance(self.interfaces[0], GroupValue):
+            for child, cv in zip(self.children(), v):
+                child.set_all(cv, clip)
+        else:
+            for itf in self.interfaces: itf.set(v)
+
+    def set_array(self, values, clip: bool = False):
+        """
+        Sets one value per member: shape (n,), or (n, children) for group
+        interfaces. Out of range values are handled like in set_all().
+        """
+
+        if self._array is not None:
+            values = np.asarray(values, dtype=float)
+            if values.shape != (len(self.interfaces),):
+                raise ValueError(f"Expected {len(self.interfaces)} values, got shape {values.shape}")
+
+            self._set(values + self._offsets, clip)
+
+        elif isinstance(self.interfaces[0], GroupValue):
+            values = np.asarray(values, dtype=float)
+            for col, child in enumerate(self.children()):
+                child.set_array(values[:, col], clip)
+
+        else:
+            for itf, v in zip(self.interfaces, values): itf.set(v)
+
+    def _set(self, values: np.ndarray, clip: bool):
+        if clip:
+            values = np.clip(values, self._array.min, self._array.max)
+        self._array.set(values)
+
+    def get(self):
+        if self._array is not None:
+            return self._array.get()
+        return [itf.get() for itf in self.interfaces]
+
+
+# ┌────────────────────────────────────────┐
+# │ Fixture_Group class                    │
+# └────────────────────────────────────────┘
+
+class Fixture_Group:
+    """
+    Set of fixtures, whose same named interfaces are gathered in interface
+    groups: group["dimmer"], or group["color.r"] for children. Fixtures not
+    having an interface are left out of its group.
+
+    Interface groups are built once, after the fixtures are patched.
+    """
+
+    def __init__(self, fixtures: List[Fixture]):
+        self.fixtures = list(fixtures)
+        self._groups  = dict()
+
+    def __len__(self):
+        return len(self.fixtures)
+
+    def __iter__(self):
+        return iter(self.fixtures)
+
+    def __getitem__(self, key):
+        if   isinstance(key, str):   return self.interfaces(key)
+        elif isinstance(key, slice): return Fixture_Group(self.fixtures[key])
+        return self.fixtures[key]
+
+    def interfaces(self, name: str):
+        """
+        Group of the interfaces with given name, dotted for children
+        """
+
+        if name not in self._groups:
+            parent, _, child = name.rpartition(".")
+
+            if parent:
+                self._groups[name] = getattr(self.interfaces(parent), child)
+            else:
+                interfaces = [fixt.interfaces[name] for fixt in self.fixtures if name in fixt.interfaces]
+                if not interfaces:
+                    raise KeyError(f"No fixture with interface {name}")
+
+                self._groups[name] = Interface_Group(interfaces)
+
+        return self._groups[name]
@@ -8,10 +8,14 @@
 """
 
 import asyncio
-import time
+import inspect
+
+import numpy as np
 
 from abc                    import ABC, abstractmethod
-from pyshow.core.interfaces import BaseValue, RangeValue
+from pyshow.core.interfaces import BaseValue, RangeValue, RangeValue_Array
+from pyshow.core.curves     import Curve, CURVE_LINEAR
+from pyshow.core.clock      import Clock, CLOCK_MONOTONIC
 
 from dataclasses            import dataclass
 
@@ -22,15 +26,81 @@ from typing import List, Dict, Tuple
 # └────────────────────────────────────────┘
 
 class Function:
-    def __init__(self, interface: BaseValue = None):
+    """
+    Functions are updated synchronously using update_sync(), unless they need to
+    await something: an asynchronous _compute_value() implementation, or a custom
+    update() coroutine. Such functions have their awaits attribute set, and must
+    be updated through update().
+
+    Subclasses usually implement _due(), which tells if a value is to be computed,
+    _compute_value(), and _apply() to use the computed value. Functions waiting
+    for a given time implement _next_due() too, so that scenes do not update
+    them before.
+
+    Functions needing the current time outside of updates read it from their
+    clock, which must be the one giving the update timestamps: timestamps from
+    another time base, like time.time(), make fades complete at once.
+
+    Scenes only update the functions that are not finished. A function that has
+    something to do again must be activated using _activate() rather than by
+    setting its dirty event, so that its scenes update it again. Scene.trigger()
+    activates all the functions of the scene, so trigger() overrides do not
+    have to call this implementation.
+    """
+
+    awaits         = False # True if the function must be updated using update()
+    _compute_async = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls._compute_async = inspect.iscoroutinefunction(cls._compute_value)
+        cls.awaits         = (
+            cls._compute_async
+            or (("update" in vars(cls)) and ("update_sync" not in vars(cls)))
+            or any(getattr(base, "awaits", False) for base in cls.__bases__)
+        )
+
+    def __init__(self, interface: BaseValue = None, clock: Clock = None):
         self.interface = interface
+        self.clock     = clock or CLOCK_MONOTONIC
         self.dirty     = asyncio.Event()
+        self._scenes   = [] # Scenes tracking the function activity
+
+    # ──────────────── Update ──────────────── #
+
+    def update_sync(self, timestamp: float):
+        if self._due(timestamp):
+            self._apply(self._compute_value(timestamp), timestamp)
 
     async def update(self, timestamp: float):
+        # timestamp must come from the function clock
+        if not self._compute_async:
+            self.update_sync(timestamp)
+        elif self._due(timestamp):
+            self._apply(await self._compute_value(timestamp), timestamp)
+
+    def _due(self, timestamp: float):
+        return False
+
+    def _next_due(self):
+        # Timestamp of next update with something to do, None for next tick
+        return None
+
+    def _compute_value(self, timestamp: float):
+        return None
+
+    def _apply(self, v, timestamp: float):
         pass
 
-    def trigger(self):
+    # ─────────────── Lifecycle ────────────── #
+
+    def _activate(self):
         self.dirty.set()
+        for scene in self._scenes: scene._function_activated(self)
+
+    def trigger(self):
+        self._activate()
 
     def finished(self):
         return not self.dirty.is_set()
@@ -40,14 +110,14 @@ class Function:
 # └────────────────────────────────────────┘
 
 class Function_Delay(Function):
-    def __init__(self, delay_s: float):
-        super().__init__()
+    def __init__(self, delay_s: float, clock: Clock = None):
+        super().__init__(clock=clock)
 
         self.delay_s = delay_s
 
         self.tend    = None
 
-    async def update(self, tstamp: float):
+    def update_sync(self, tstamp: float):
         # Delay has just started
         if self.tend is None:
             self.tend = tstamp + self.delay_s
@@ -57,25 +127,29 @@ class Function_Delay(Function):
             self.tend = None
             self.dirty.clear()
 
+    def _next_due(self):
+        return self.tend
+
 
 # ┌────────────────────────────────────────┐
 # │ Static function                        │
 # └────────────────────────────────────────┘
 
 class Function_Static(Function):
-    def __init__(self, interface: BaseValue = None, target: float = 0.0):
-        super().__init__(interface)
+    def __init__(self, interface: BaseValue = None, target: float = 0.0, clock: Clock = None):
+        super().__init__(interface, clock)
         self._target = target
 
-    async def update(self, timestamp: float):
-        if self.dirty.is_set():
-            v = await self._compute_value(timestamp)
-            self.interface.set(v)
-            self.dirty.clear()
+    def _due(self, timestamp: float):
+        return self.dirty.is_set()
 
-    async def _compute_value(self, timestamp: float):
+    def _compute_value(self, timestamp: float):
         return self._target
 
+    def _apply(self, v, timestamp: float):
+        self.interface.set(v)
+        self.dirty.clear()
+
     @property
     def target(self):
         return self._target
@@ -83,7 +157,7 @@ class Function_Static(Function):
     @target.setter
     def target(self, v: float):
         self._target = v
-        self.dirty.set()
+        self._activate()
 
 
 # ┌────────────────────────────────────────┐
@@ -91,12 +165,25 @@ class Function_Static(Function):
 # └────────────────────────────────────────┘
 
 class Function_Fade(Function):
-    def __init__(self, target: float, fade_time_s: float, interface: RangeValue = None):
-        super().__init__(interface)
+    """
+    Fade from the current interface value to the target value, linear unless a
+    curve from pyshow.core.curves is given.
+
+    When an engine (like pyshow.dmx.fade_engine.Fade_Engine_DMX) is given, the
+    interpolation is left to it, and updating the function only marks the fade
+    as alive.
+    """
+
+    def __init__(self, target: float, fade_time_s: float, interface: RangeValue = None,
+        curve: Curve = None, engine = None, clock: Clock = None):
+        super().__init__(interface, clock)
         if not isinstance(interface, RangeValue):
             raise TypeError(f"{self.__class__.name} only works for RangeValue based interfaces")
 
         self.fade_time_s   = fade_time_s # Fade time before target value
+        self.curve         = None if curve is CURVE_LINEAR else curve
+        self.engine        = engine      # Optional fade engine
+        self._engine_row   = None
 
         self.target        = target
 
@@ -112,22 +199,38 @@ class Function_Fade(Function):
 
 
 
-    async def update(self, timestamp: float):
-        if self.dirty.is_set():
-            v = await self._compute_value(timestamp)
-            self.interface.set(v)
+    def update_sync(self, timestamp: float):
+        if self.engine is None:
+            super().update_sync(timestamp)
+
+        elif self.dirty.is_set():
+            owned = self.engine.mark(self._engine_row, self, timestamp)
+            if (not owned) or (timestamp > self._tstamp_end):
+                self.dirty.clear() # Last value will be set by engine, or fade replaced
+
+
+    def _due(self, timestamp: float):
+        return self.dirty.is_set()
+
+    def _apply(self, v, timestamp: float):
+        self.interface.set(v)
+
+        if timestamp > self._tstamp_end:
+            self.dirty.clear() # Last value has been set!
 
-            if timestamp > self._tstamp_end:
-                self.dirty.clear() # Last value has been set!
-    
 
-    async def _compute_value(self, timestamp: float):
+    def _compute_value(self, timestamp: float):
         v_cur = self.interface.get()     # Current value
         v_new = self.target              # By default, target value
 
-        if timestamp < self._tstamp_end: # In middle of an update, compute value using linear interpolation
+        if timestamp < self._tstamp_end: # In middle of an update, compute value from the curve
             dt    = timestamp-self._tstamp_start
-            v_new = self._delta*dt + self._v_start
+
+            if self.curve is None:
+                v_new = self._delta*dt + self._v_start
+            else:
+                x     = dt/(self._tstamp_end-self._tstamp_start)
+                v_new = self._v_start + (self.target-self._v_start)*self.curve(x)
 
         # Clip value
         v_new = self.interface.max if v_new > self.interface.max else v_new
@@ -139,16 +242,23 @@ class Function_Fade(Function):
 
 
     def trigger(self):
-        self._v_start      = self.interface.get()
-        self._tstamp_start = time.time()
+        self._tstamp_start = self.clock.now()
+        self._tstamp_end   = self._tstamp_start + self.fade_time_s
 
-        self._tstamp_end   = time.time() + self.fade_time_s
+        if self.engine is not None:
+            self._v_start    = self.engine.value(self.interface, self._tstamp_start)
+            self._engine_row = self.engine.add(self, self.interface,
+                self._v_start, self.target, self._tstamp_start, self._tstamp_end, self.curve
+            )
 
-        dy           = self.target-self._v_start
-        dx           = self._tstamp_end-self._tstamp_start
-        self._delta  = dy/dx
+        else:
+            self._v_start = self.interface.get()
 
-        self.dirty.set()
+            dy            = self.target-self._v_start
+            dx            = self._tstamp_end-self._tstamp_start
+            self._delta   = dy/dx
+
+        self._activate()
 
 
 # ┌────────────────────────────────────────┐
@@ -156,15 +266,23 @@ class Function_Fade(Function):
 # └────────────────────────────────────────┘
 
 class Function_Animation(Function):
-    def __init__(self, interface: BaseValue = None):
-        super().__init__(interface)
-        
-    async def update(self, timestamp: float):
-        v = await self._compute_value(timestamp)
+    """
+    Function computing a new value on every update. An animation is active from
+    the start, so that scenes play it even if it is never triggered.
+    """
+
+    def __init__(self, interface: BaseValue = None, clock: Clock = None):
+        super().__init__(interface, clock)
+        self.dirty.set()
+
+    def _due(self, timestamp: float):
+        return True
+
+    def _apply(self, v, timestamp: float):
         self.interface.set(v)
         self.dirty.set()
 
-    async def _compute_value(self, timestamp: float):
+    def _compute_value(self, timestamp: float):
         pass
 
 
@@ -173,25 +291,29 @@ class Function_Animation(Function):
 # └────────────────────────────────────────┘
 
 class Function_Periodic(Function):
-    def __init__(self, period_s: float, interface: BaseValue = None ):
-        super().__init__(interface)
+    def __init__(self, period_s: float, interface: BaseValue = None, clock: Clock = None):
+        super().__init__(interface, clock)
 
         self.period_s       = period_s
         self.last_execution = 0.0
 
 
-    async def update(self, timestamp: float):
+    def _due(self, timestamp: float):
         if (timestamp - self.last_execution) >= self.period_s:
             self.dirty.set()
 
-        if self.dirty.is_set():
-            v = await self._compute_value(timestamp)
-            self.interface.set(v)
-            self.dirty.clear()
-            self.last_execution = timestamp
+        return self.dirty.is_set()
+
+    def _next_due(self):
+        return None if self.dirty.is_set() else self.last_execution + self.period_s
+
+    def _apply(self, v, timestamp: float):
+        self.interface.set(v)
+        self.dirty.clear()
+        self.last_execution = timestamp
 
 
-    async def _compute_value(self, timestamp: float):
+    def _compute_value(self, timestamp: float):
         pass
 
     def finished(self):
@@ -202,18 +324,80 @@ class Function_Periodic(Function):
 # └────────────────────────────────────────┘
 
 class Function_Animation_Expr(Function_Animation):
-    def __init__(self, interface: BaseValue, expr):
-        super().__init__(interface)
+    def __init__(self, interface: BaseValue, expr, clock: Clock = None):
+        super().__init__(interface, clock)
         self.expr = expr
 
-    async def _compute_value(self, timestamp: float):
+    def _compute_value(self, timestamp: float):
         return self.expr(self, timestamp)
 
 
 class Function_Periodic_Expr(Function_Periodic):
-    def __init__(self, interface: BaseValue, period_s: float, expr):
-        super().__init__(period_s=period_s, interface=interface)
+    def __init__(self, interface: BaseValue, period_s: float, expr, clock: Clock = None):
+        super().__init__(period_s=period_s, interface=interface, clock=clock)
         self.expr = expr
 
-    async def _compute_value(self, timestamp: float):
+    def _compute_value(self, timestamp: float):
         return self.expr(self, timestamp)
+
+
+# ┌────────────────────────────────────────┐
+# │ Group expression functions             │
+# └────────────────────────────────────────┘
+
+class Function_Expr_Group:
+    """
+    Mixin for expression functions driving several range interfaces, for
+    instance the dimmers of a fixture group. The expression is evaluated once
+    per update, on arrays:
+
+        expr(fkt, t, idx, phase, pos)
+
+    with t the timestamp, idx the index of each interface, phase their phase
+    offsets and pos their positions (shape (n,) or (n, k), like fixture
+    coordinates). It returns one value per interface, or a scalar for all of
+    them. Values are clipped to the interfaces ranges, and written at once.
+    """
+
+    def _group_init(self, interfaces: List[RangeValue], expr, phase = None, position = None):
+        self.array    = RangeValue_Array(interfaces)
+        self.expr     = expr
+
+        count         = len(self.array)
+        self.idx      = np.arange(count)
+        self.phase    = np.zeros(count) if phase    is None else np.asarray(phase,    dtype=float)
+        self.position = np.zeros(count) if position is None else np.asarray(position, dtype=float)
+
+        if (self.phase.shape != (count,)) or (len(self.position) != count):
+            raise ValueError("Expected one phase and one position per interface")
+
+    @property
+    def interfaces(self):
+        return self.array.interfaces
+
+    def _compute_value(self, timestamp: float):
+        v = self.expr(self, timestamp, self.idx, self.phase, self.position)
+        return np.clip(v, self.array.min, self.array.max)
+
+
+class Function_Animation_Expr_Group(Function_Expr_Group, Function_Animation):
+    def __init__(self, interfaces: List[RangeValue], expr, phase = None, position = None,
+        clock: Clock = None):
+        super().__init__(clock=clock)
+        self._group_init(interfaces, expr, phase, position)
+
+    def _apply(self, v, timestamp: float):
+        self.array.set(v)
+        self.dirty.set()
+
+
+class Function_Periodic_Expr_Group(Function_Expr_Group, Function_Periodic):
+    def __init__(self, interfaces: List[RangeValue], period_s: float, expr, phase = None, position = None,
+        clock: Clock = None):
+        super().__init__(period_s=period_s, clock=clock)
+        self._group_init(interfaces, expr, phase, position)
+
+    def _apply(self, v, timestamp: float):
+        self.array.set(v)
+        self.dirty.clear()
+        self.last_execution = timestamp
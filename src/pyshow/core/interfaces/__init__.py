@@ -7,16 +7,32 @@
  July 2022
 """
 
-from dataclasses import dataclass, field
-from typing      import Optional, Dict
+import numpy as np
+
+from dataclasses import dataclass, field, fields
+from typing      import Optional, Dict, ClassVar, Tuple, List
 
 
 # ┌────────────────────────────────────────┐
 # │ BaseValue base class                   │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
-class BaseValue:
+# Interfaces are slotted dataclasses: dataclass only creates slots for fields,
+# so the private state of all interfaces is declared in this root class.
+# Transport specific state is declared by transport specific base classes.
+#
+# Slotted dataclasses are recreated by the dataclass decorator, which breaks
+# zero-argument super() in their methods: the class is given explicitly.
+
+class _Value_Slots:
+    __slots__ = (
+        "_fixture", # Attached fixture
+        "_value",   # Current value
+    )
+
+
+@dataclass(kw_only=True, slots=True)
+class BaseValue(_Value_Slots):
     class_id: str = ""
 
     def __post_init__(self):
@@ -41,53 +57,64 @@ class BaseValue:
 # │ AtomicValue interface class            │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class AtomicValue(BaseValue):
     def __post_init__(self):
-        super().__post_init__()
-        self.__fixture = None
+        super(AtomicValue, self).__post_init__()
+        self._fixture = None
 
 
     @property
     def fixture(self):
-        return self.__fixture
+        return self._fixture
     
 
     @fixture.setter
     def fixture(self, fixt):
-        self.__fixture = fixt
+        self._fixture = fixt
 
 
 # ┌────────────────────────────────────────┐
 # │ GroupValue interface class             │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class GroupValue(BaseValue):
+    # Names of children interfaces. When None, all fields holding an
+    # interface are children.
+    _children: ClassVar[Optional[Tuple[str, ...]]] = None
+
     def __post_init__(self):
-        super().__post_init__()
-        self.__fixture = None
+        super(GroupValue, self).__post_init__()
+        self._fixture = None
+
+    def children(self):
+        if self._children is None:
+            return tuple(
+                getattr(self, f.name) for f in fields(self)
+                if isinstance(getattr(self, f.name), BaseValue)
+            )
+        return tuple(getattr(self, name) for name in self._children)
 
     @property
     def fixture(self):
-        return self.__fixture
+        return self._fixture
         
     
     @fixture.setter
     def fixture(self, fixt):
-        self.__fixture = fixt
+        self._fixture = fixt
 
         # Attach to children
-        for ch_name, ch in self.__dict__.items():
-            if isinstance(ch, BaseValue):
-                ch.fixture = self.__fixture
+        for ch in self.children():
+            ch.fixture = self._fixture
 
 
 # ┌────────────────────────────────────────┐
 # │ RangeValue interface class             │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RangeValue(AtomicValue):
     min: float
     max: float
@@ -99,7 +126,7 @@ class RangeValue(AtomicValue):
     # ─────────────── Post init ────────────── #
     
     def __post_init__(self):
-        super().__post_init__()
+        super(RangeValue, self).__post_init__()
         self._value = 0
 
     # ────────────── Set and get ───────────── #
@@ -119,19 +146,91 @@ class RangeValue(AtomicValue):
     def _on_set(self, v):
         pass
 
+    @staticmethod
+    def _array_output(interfaces: List["RangeValue"]):
+        # Object writing the values of several interfaces of this class at
+        # once through its set(values) method, None if not supported.
+        return None
+
+
+# ┌────────────────────────────────────────┐
+# │ RangeValue_Array class                 │
+# └────────────────────────────────────────┘
+
+class RangeValue_Array:
+    """
+    Sets several range interfaces at once from an array of values. Interfaces
+    classes may provide a vectorized output (see RangeValue._array_output()),
+    others are set one by one.
+
+    Outputs are resolved when the array is built: build it again if fixtures
+    are assigned again.
+    """
+
+    def __init__(self, interfaces: List[RangeValue]):
+        self.interfaces = list(interfaces)
+
+        self.min        = np.array([itf.min    for itf in self.interfaces], dtype=float)
+        self.max        = np.array([itf.max    for itf in self.interfaces], dtype=float)
+        self.invert     = np.array([itf.invert for itf in self.interfaces], dtype=bool)
+
+        self._outputs   = [] # (positions, output)
+        self._fallback  = [] # Positions of interfaces set one by one
+
+        groups = dict()
+        for pos, itf in enumerate(self.interfaces):
+            groups.setdefault(type(itf)._array_output, []).append(pos)
+
+        for hook, positions in groups.items():
+            output = hook([self.interfaces[pos] for pos in positions])
+            if output is None:
+                self._fallback += positions
+            elif len(positions) == len(self.interfaces):
+                self._outputs.append((slice(None), output))
+            else:
+                self._outputs.append((np.array(positions), output))
+
+    def __len__(self):
+        return len(self.interfaces)
+
+    def set(self, values: np.ndarray):
+        values = np.broadcast_to(np.asarray(values, dtype=float), (len(self.interfaces),))
+
+        # Same errors as RangeValue.set(), for the first invalid value
+        low, high = values < self.min, values > self.max
+        if low.any():
+            pos = int(np.argmax(low))
+            raise ValueError(f"{values[pos]} < {self.min[pos]}")
+        elif high.any():
+            pos = int(np.argmax(high))
+            raise ValueError(f"{values[pos]} > {self.max[pos]}")
+
+        for itf, v in zip(self.interfaces, values.tolist()):
+            itf._value = v
+
+        v_out = np.where(self.invert, self.max-values, values)
+        for positions, output in self._outputs:
+            output.set(v_out[positions])
+
+        for pos in self._fallback:
+            self.interfaces[pos]._on_set(float(v_out[pos]))
+
+    def get(self):
+        return np.array([itf._value for itf in self.interfaces], dtype=float)
+
 
 # ┌────────────────────────────────────────┐
 # │ DiscreteValue interface class          │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DiscreteValue_Choice:
     label: str
     value: any
     image: Optional[str] = ""
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DiscreteValue(AtomicValue):
     choices: Dict[str, DiscreteValue_Choice]
 
@@ -140,7 +239,7 @@ class DiscreteValue(AtomicValue):
     # ─────────────── Post init ────────────── #
     
     def __post_init__(self):
-        super().__post_init__()
+        super(DiscreteValue, self).__post_init__()
         self._value  = None
 
 
@@ -165,7 +264,7 @@ class DiscreteValue(AtomicValue):
 # │ ColorValue interface                   │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ColorValue(GroupValue):
     r: RangeValue
     g: RangeValue
@@ -173,18 +272,22 @@ class ColorValue(GroupValue):
 
     class_id: str = "ColorValue"
 
+    _children: ClassVar[Tuple[str, ...]] = ("r", "g", "b")
+
 
 # ┌────────────────────────────────────────┐
 # │ RotationValue interface                │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class RotationValue(GroupValue):
     pan:  RangeValue
     tilt: RangeValue
     
     class_id: str = "RotationValue"
 
+    _children: ClassVar[Tuple[str, ...]] = ("pan", "tilt")
+
     def set(self, x: float, y: float):
         self.pan.set(x)
         self.tilt.set(y)
@@ -0,0 +1,191 @@
+"""
+┌────────────────────────┐
+│ Fixed rate show runner │
+└────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import asyncio
+import logging
+import math
+
+from typing                import List, Callable
+
+from pyshow.core.clock     import Clock, CLOCK_MONOTONIC
+
+
+# ┌────────────────────────────────────────┐
+# │ Show_Runner class                      │
+# └────────────────────────────────────────┘
+
+class Show_Runner:
+    """
+    Runs a show at a fixed rate. Each tick updates the items (scenes, choosers,
+    sequences, or anything with an update coroutine), calls the hooks, then
+    flushes the transports.
+
+    Ticks are scheduled on absolute deadlines using the event loop clock, so the
+    time spent in a tick does not delay the next ones. When a tick overruns its
+    period, the missed ticks are skipped and the runner stays on its time grid.
+
+    Control desks are started with the runner and stopped when it returns.
+
+    Tick timestamps are read from the clock, which must be the clock of the
+    functions being updated. When a clock is given, it is also set on the
+    items. With a virtual clock, the runner advances it by one period at each
+    tick instead of waiting, so the show runs as fast as possible.
+    """
+
+    def __init__(self, rate_hz: float = 44.0,
+        items: List[any] = None, transports: List[any] = None, desks: List[any] = None,
+        hooks: List[Callable[[float], None]] = None, clock: Clock = None):
+
+        if rate_hz <= 0:
+            raise ValueError(f"Invalid rate: {rate_hz}")
+
+        self.period_s   = 1.0/rate_hz
+
+        self.items      = items      or []
+        self.transports = transports or []
+        self.desks      = desks      or []
+        self.hooks      = hooks      or [] # Called each tick with the timestamp
+        self.clock      = clock      or CLOCK_MONOTONIC
+
+        if clock is not None:
+            for item in self.items:
+                if hasattr(item, "clock"): item.clock = clock
+
+        self.log        = logging.getLogger("Show runner")
+
+        self._running   = False
+
+        self.stats_reset()
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Statistics                             │
+    # └────────────────────────────────────────┘
+
+    def stats_reset(self):
+        self.ticks          = 0   # Executed ticks
+        self.overruns       = 0   # Ticks that lasted more than a period
+        self.ticks_skipped  = 0   # Ticks skipped because of overruns
+
+        self._tstamp_first  = None
+        self._tstamp_last   = None
+
+        # Lateness of tick start against its deadline (Welford's algorithm)
+        self._late_mean     = 0.0
+        self._late_m2       = 0.0
+        self.late_max_s     = 0.0
+
+    def _stats_tick(self, tstamp: float, late: float):
+        if self._tstamp_first is None:
+            self._tstamp_first = tstamp
+        self._tstamp_last = tstamp
+
+        self.ticks     += 1
+        delta           = late - self._late_mean
+        self._late_mean+= delta/self.ticks
+        self._late_m2  += delta*(late - self._late_mean)
+        self.late_max_s = max(self.late_max_s, late)
+
+    def rate_hz(self):
+        """
+        Achieved tick rate
+        """
+
+        if self.ticks < 2:
+            return 0.0
+        return (self.ticks-1) / (self._tstamp_last - self._tstamp_first)
+
+    def jitter_s(self):
+        """
+        Standard deviation of tick start time against its deadline
+        """
+
+        if self.ticks < 2:
+            return 0.0
+        return math.sqrt(self._late_m2 / (self.ticks-1))
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Tick                                   │
+    # └────────────────────────────────────────┘
+
+    async def tick(self, tstamp: float):
+        for item in self.items:
+            await item.update(tstamp)
+
+        for hook in self.hooks:
+            hook(tstamp)
+
+        for transport in self.transports:
+            transport.flush()
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Run and stop                           │
+    # └────────────────────────────────────────┘
+
+    async def run(self, duration_s: float = None):
+        """
+        Runs until stop() is called, or during the given duration.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        for desk in self.desks:
+            desk.start(loop)
+
+        self._running = True
+        try:
+            if not self.clock.realtime:
+                await self._run_virtual(loop, duration_s)
+                return
+
+            deadline = loop.time()
+            t_end    = None if duration_s is None else deadline + duration_s
+
+            while self._running and ((t_end is None) or (deadline < t_end)):
+                t_start = loop.time()
+                self._stats_tick(t_start, t_start - deadline)
+
+                await self.tick(self.clock.now())
+
+                # Next deadline
+                deadline += self.period_s
+                t_now     = loop.time()
+
+                if t_now > deadline:
+                    skipped             = math.ceil((t_now - deadline) / self.period_s)
+                    deadline           += skipped*self.period_s
+                    self.overruns      += 1
+                    self.ticks_skipped += skipped
+                    self.log.debug(f"Overrun: {(t_now-t_start)*1000:.2f}ms, skipped {skipped} ticks")
+
+                await asyncio.sleep(deadline - loop.time())
+
+        finally:
+            self._running = False
+            for desk in self.desks:
+                desk.stop()
+
+
+    async def _run_virtual(self, loop, duration_s: float = None):
+        # Duration is in clock time
+        t_end = None if duration_s is None else self.clock.now() + duration_s
+
+        while self._running and ((t_end is None) or (self.clock.now() < t_end)):
+            self._stats_tick(loop.time(), 0.0)
+
+            await self.tick(self.clock.now())
+            self.clock.advance(self.period_s)
+
+            await asyncio.sleep(0) # Let other tasks run
+
+
+    def stop(self):
+        self._running = False
@@ -8,34 +8,144 @@
 """
 
 import asyncio
+import heapq
+import itertools
 import time
 
 from typing                import List, Dict, Tuple
 from pyshow.core.functions import (Function)
-from functools             import reduce
+from pyshow.core.clock     import Clock, CLOCK_MONOTONIC
+from pyshow.core.curves    import Curve
 
 # ┌────────────────────────────────────────┐
 # │ Basic scene                            │
 # └────────────────────────────────────────┘
 
 class Scene:
-    def __init__(self, functions: List[Function] = None):
-        self.functions = functions or []
+    """
+    Set of functions updated together. Functions that do not await anything are
+    updated in a plain loop; only the others go through asyncio.gather.
+
+    Only active functions are updated: the ones that are not finished. Functions
+    leave the active set when they finish, and enter it again when activated.
+    Triggering the scene activates all its functions, even the ones overriding
+    trigger() without calling Function.trigger(): they are updated at least once,
+    and stay active as long as they are not finished. A scene is finished when no
+    function is active.
+
+    Active functions waiting for a given time (see Function._next_due()), like
+    periodic functions and delays, are put to sleep in a heap ordered by due
+    time, and only updated again when due. Functions due by the next update,
+    guessed from the last update interval, are simply kept active.
+
+    Functions are sorted when the functions attribute is assigned, so the list
+    should be assigned again rather than modified in place.
+
+    When a clock is given, it is set on all the functions of the scene.
+    """
+
+    def __init__(self, functions: List[Function] = None, clock: Clock = None):
+        self._clock     = None
+        self._functions = []
+        self.functions  = functions or []
+        self.clock      = clock
+
+    @property
+    def functions(self):
+        return self._functions
+
+    @functions.setter
+    def functions(self, functions: List[Function]):
+        for fkt in self._functions:
+            fkt._scenes.remove(self)
+
+        self._functions    = functions
+        self._active_sync  = dict() # Active functions, in activation order
+        self._active_async = dict()
+
+        self._sleeping     = dict() # Sleeping function -> heap entry token
+        self._heap         = []     # (due timestamp, token, function)
+        self._tokens       = itertools.count()
+        self._tstamp_last  = None
+
+        for fkt in functions:
+            fkt._scenes.append(self)
+            if not fkt.finished():
+                self._function_activated(fkt)
+
+        if self._clock is not None:
+            for fkt in functions: fkt.clock = self._clock
+
+    @property
+    def clock(self):
+        return self._clock or CLOCK_MONOTONIC
+
+    @clock.setter
+    def clock(self, clock: Clock):
+        self._clock = clock
+        if clock is not None:
+            for fkt in self._functions: fkt.clock = clock
+
+    def _function_activated(self, fkt: Function):
+        self._sleeping.pop(fkt, None) # Heap entry is now stale
+
+        if fkt.awaits: self._active_async[fkt] = None
+        else:          self._active_sync [fkt] = None
 
     def trigger(self):
-        for f in self.functions: f.trigger()
+        for f in self.functions:
+            f.trigger()
+            self._function_activated(f) # Settled on next update if finished
+
+    # ──────────────── Update ──────────────── #
+
+    def _settle(self, fkt: Function, active: Dict[Function, None], horizon: float):
+        # Remove updated function from active set if finished, or until due
+        if fkt.finished():
+            active.pop(fkt, None)
+            return
+
+        due = fkt._next_due()
+        if (due is not None) and (due > horizon):
+            del active[fkt]
+
+            token               = next(self._tokens)
+            self._sleeping[fkt] = token
+            heapq.heappush(self._heap, (due, token, fkt))
+
+    def _wake(self, timestamp: float):
+        heap = self._heap
+        while heap and (heap[0][0] <= timestamp):
+            due, token, fkt = heapq.heappop(heap)
+            if self._sleeping.get(fkt) == token:
+                self._function_activated(fkt)
 
     async def update(self, timestamp: float):
-        await asyncio.gather(*[
-            fkt.update(timestamp) for fkt in self.functions
-        ])
+        if self._heap:
+            self._wake(timestamp)
+
+        # Expected timestamp of next update, with half an interval of margin
+        horizon           = timestamp if self._tstamp_last is None else timestamp + 1.5*(timestamp - self._tstamp_last)
+        self._tstamp_last = timestamp
+
+        if self._active_sync:
+            active = self._active_sync
+            for fkt in list(active):
+                fkt.update_sync(timestamp)
+                self._settle(fkt, active, horizon)
+
+        if self._active_async:
+            active = self._active_async
+            fkts   = list(active)
+            await asyncio.gather(*[
+                fkt.update(timestamp) for fkt in fkts
+            ])
+
+            for fkt in fkts:
+                if fkt in active: self._settle(fkt, active, horizon)
 
     def finished(self):
-        return reduce(
-            lambda a,b: a and b,
-            map(lambda x: x.finished(), self.functions),
-            True
-        )
+        return not (self._active_sync or self._active_async or self._sleeping)
 
 
 # ┌────────────────────────────────────────┐
@@ -43,8 +153,31 @@ class Scene:
 # └────────────────────────────────────────┘
 
 class Scene_Chooser:
-    def __init__(self, scenes: Dict[str, Scene] = None):
+    """
+    Plays one scene out of a dict, and flashes another one on top of it.
+
+    Without merger, the flash scene replaces the current one until released, and
+    the current scene is triggered again afterwards. With a merger (for instance
+    a Merge_Engine_DMX), the current and flash scenes are rendered on their own
+    layers and merged: the flash overlays the current scene, which keeps playing
+    underneath. The chooser then updates the merger.
+
+    A merger also allows crossfades: when fade_s is given, the previous scene
+    keeps playing while the output is blended to the new one along curve.
+    """
+
+    def __init__(self, scenes: Dict[str, Scene] = None, clock: Clock = None, merger: any = None,
+        fade_s: float = 0.0, curve: Curve = None):
+
+        if (fade_s > 0) and (merger is None):
+            raise ValueError("Crossfades need a merger")
+
         self.scenes              = scenes or dict()
+        self.merger              = merger
+        self.clock               = clock
+
+        self.fade_s              = fade_s
+        self.curve               = curve
 
         self._scene_current      = None
         self._scene_flash        = None
@@ -52,18 +185,55 @@ class Scene_Chooser:
         self._scene_current_name = None
         self._scene_flash_name   = None
 
+        if merger is not None:
+            # Two layers for current scene, to crossfade from one to the other
+            self._layer_current  = merger.layer_new(priority=0)
+            self._layer_next     = merger.layer_new(priority=0)
+            self._layer_flash    = merger.layer_new(priority=1)
+
+
+    @property
+    def clock(self):
+        return self._clock or CLOCK_MONOTONIC
+
+    @clock.setter
+    def clock(self, clock: Clock):
+        # Set on all scenes when given
+        self._clock = clock
+        if clock is not None:
+            for scene in self.scenes.values(): scene.clock = clock
+            if self.merger is not None: self.merger.clock = clock
+
 
     # ┌────────────────────────────────────────┐
     # │ Choose and get current scene           │
     # └────────────────────────────────────────┘
     
-    def choose(self, name: str):
+    def choose(self, name: str, fade_s: float = None, curve: Curve = None):
+        """
+        Plays given scene, crossfading from the current one in fade_s seconds
+        along curve. Chooser defaults are used when not given.
+        """
+
+        fade_s = self.fade_s if fade_s is None else fade_s
+        curve  = curve or self.curve
+
+        if (fade_s > 0) and (self.merger is None):
+            raise ValueError("Crossfades need a merger")
+
         try:
             self._scene_current_name = name
             self._scene_current      = self.scenes[name]
             self._scene_current.trigger()
         except KeyError as exc:
             raise KeyError(f"No such scene: {exc!s}")
+
+        if self.merger is not None:
+            # Render new scene on the other layer, and fade to it
+            self._layer_current, self._layer_next = self._layer_next, self._layer_current
+
+            self._layer_current.items = [self._scene_current]
+            self.merger.crossfade(self._layer_next, self._layer_current, fade_s, curve)
     
     def current(self):
         return self._scene_current_name
@@ -80,10 +250,18 @@ class Scene_Chooser:
         except KeyError as exc:
             raise KeyError(f"No such scene: {exc!s}")
 
+        if self.merger is not None:
+            self._layer_flash.items = [self._scene_flash]
+            self.merger.activate(self._layer_flash)
+
 
     def flash_end(self):
         self._scene_flash = None
-        if self._scene_current is not None:
+
+        if self.merger is not None:
+            # Current scene kept playing underneath
+            self.merger.release(self._layer_flash)
+        elif self._scene_current is not None:
             self._scene_current.trigger()
 
 
@@ -96,14 +274,18 @@ class Scene_Chooser:
     # └────────────────────────────────────────┘
 
     async def update(self, tstamp: float):
-        if self._scene_flash is not None:
+        if self.merger is not None:
+            await self.merger.update(tstamp)
+        elif self._scene_flash is not None:
             await self._scene_flash.update(tstamp)
         elif self._scene_current is not None:
             await self._scene_current.update(tstamp)
 
 
     def finished(self):
-        if self._scene_flash is not None:
+        if self.merger is not None:
+            return self.merger.finished()
+        elif self._scene_flash is not None:
             return self._scene_flash.finished()
         elif self._scene_current is not None:
             return self._scene_current.finished()
@@ -124,20 +306,35 @@ class Scene_Sequence:
     - loop mode: When all steps are finished, the next one is the first one.
     """
 
-    def __init__(self, steps: List[Scene], auto: bool=True, loop: bool=True):
+    def __init__(self, steps: List[Scene], auto: bool=True, loop: bool=True, clock: Clock = None):
         self.steps = steps
         self.auto  = auto
         self.loop  = loop
+        self.clock = clock
+
+        self._idx           = None
+        self._idx_triggered = None
+
+    @property
+    def clock(self):
+        return self._clock or CLOCK_MONOTONIC
 
-        self._idx  = None
+    @clock.setter
+    def clock(self, clock: Clock):
+        # Set on all steps when given
+        self._clock = clock
+        if clock is not None:
+            for step in self.steps: step.clock = clock
 
     # ──────────────── Update ──────────────── #
     async def update(self, tstamp: float):
         if not self.finished():
             cur_step = self.steps[self._idx]
 
-            # Initial trigger check
-            if cur_step.finished(): cur_step.trigger()
+            # Trigger step when entering it, or again once finished
+            if (self._idx != self._idx_triggered) or cur_step.finished():
+                cur_step.trigger()
+                self._idx_triggered = self._idx
 
             # Update
             await cur_step.update(tstamp)
@@ -153,7 +350,8 @@ class Scene_Sequence:
     # ─────────── Sequence control ─────────── #
 
     def trigger(self):
-        self._idx = 0
+        self._idx           = 0
+        self._idx_triggered = None
     
 
     def next(self):
@@ -0,0 +1,135 @@
+"""
+┌───────────────────────────┐
+│ Art-Net output controller │
+└───────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import socket
+import logging
+
+from pyshow.dmx.controller import DMX_Controller, DMX_UNIVERSE_SIZE
+
+
+# ┌────────────────────────────────────────┐
+# │ Constants                              │
+# └────────────────────────────────────────┘
+
+ARTNET_PORT        = 6454
+ARTNET_OP_DMX      = 0x5000
+ARTNET_PROT_VER    = 14
+
+ARTNET_HEADER_SIZE = 18
+
+# Offsets in ArtDMX packet
+ARTNET_OFS_SEQUENCE = 12
+ARTNET_OFS_DATA     = ARTNET_HEADER_SIZE
+
+
+def artnet_dmx_packet(port_address: int, physical: int = 0):
+    """
+    Builds an ArtDMX packet for a full universe, with a zeroed payload.
+    """
+
+    packet = bytearray(ARTNET_HEADER_SIZE + DMX_UNIVERSE_SIZE)
+
+    packet[0:8]   = b"Art-Net\x00"
+    packet[8:10]  = ARTNET_OP_DMX.to_bytes(2, "little")
+    packet[10:12] = ARTNET_PROT_VER.to_bytes(2, "big")
+    packet[12]    = 0                         # Sequence
+    packet[13]    = physical
+    packet[14]    = port_address & 0xFF       # SubUni
+    packet[15]    = (port_address >> 8) & 0x7F # Net
+    packet[16:18] = DMX_UNIVERSE_SIZE.to_bytes(2, "big")
+
+    return packet
+
+
+# ┌────────────────────────────────────────┐
+# │ Controller class                       │
+# └────────────────────────────────────────┘
+
+class DMX_Controller_ArtNet(DMX_Controller):
+    """
+    Sends ArtDMX packets over UDP. One packet is built per universe when the
+    controller is created; flushing only patches its payload and sequence number.
+
+    Universes are sent when they change, and resent every keepalive_s seconds
+    otherwise, as nodes consider a source lost when it stays silent too long.
+    """
+
+    def __init__(self, host: str, port: int = ARTNET_PORT, universes: int = 1,
+        universe_start: int = 0, keepalive_s: float = 1.0, sequence: bool = True):
+
+        super().__init__(universes, keepalive_s)
+
+        self.host           = host
+        self.port           = port
+        self.universe_start = universe_start # Port-Address of first universe
+        self.sequence       = sequence
+
+        self.sock           = None
+
+        self.log            = logging.getLogger(f"Art-Net controller to {host}:{port}")
+
+        self._packets       = [artnet_dmx_packet(universe_start+idx) for idx in range(universes)]
+        self._sequence      = 0
+
+        # ─────────────── Statistics ───────────── #
+
+        self.packets_sent    = 0
+        self.packets_dropped = 0 # Packets that could not be sent
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller hooks                       │
+    # └────────────────────────────────────────┘
+
+    def _on_flush(self, frame: memoryview):
+        if self.sequence:
+            # Same sequence number for all universes of a frame, 0 is reserved
+            self._sequence = (self._sequence % 255) + 1
+
+        super()._on_flush(frame)
+
+
+    def _on_universe_flush(self, idx: int, data: memoryview):
+        packet                       = self._packets[idx]
+        packet[ARTNET_OFS_SEQUENCE]  = self._sequence
+        packet[ARTNET_OFS_DATA:]     = data
+
+        if self.sock is None:
+            return
+
+        try:
+            self.sock.sendto(packet, (self.host, self.port))
+            self.packets_sent += 1
+        except OSError as exc: # BlockingIOError included
+            self.log.debug(f"Failed to send universe {self.universe_start+idx}: {exc}")
+            self.packets_dropped += 1
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller specific functions          │
+    # └────────────────────────────────────────┘
+
+    def open(self):
+        self.log.info("Open controller")
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.setblocking(False)
+
+        # Send everything on first flush
+        self._universes_expire()
+
+    def close(self):
+        if self.sock is None:
+            return # Not opened, or already closed
+
+        self.log.info("Close controller")
+
+        self.sock.close()
+        self.sock = None
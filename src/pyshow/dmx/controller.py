@@ -7,26 +7,111 @@
  July 2022
 """
 
+import time
+
 from abc import ABC, abstractmethod
 
 
+# ┌────────────────────────────────────────┐
+# │ Constants                              │
+# └────────────────────────────────────────┘
+
+DMX_UNIVERSE_SIZE = 512
+
+
 # ┌────────────────────────────────────────┐
 # │ DMX Controller base class              │
 # └────────────────────────────────────────┘
 
 class DMX_Controller:
-    def __init__(self):
-        pass
+    """
+    Base class for DMX outputs. The controller owns the universe frame buffer:
+    channel values are written into it, and the transport reads the whole frame
+    when flush() is called.
+
+    Universes are stored one after the other in the same buffer, so that the
+    absolute index of a channel is universe*DMX_UNIVERSE_SIZE + channel.
+
+    Writes are not tracked: channels may be set through ch_set() or straight
+    into the frame (like DMX interfaces do), and changes are found by
+    comparing each universe to its copy as of the last flush (see dirty()).
+
+    Transports implement _on_universe_flush(), called by flush() for each
+    universe that changed. Transports sending whole frames override _on_flush()
+    instead. When keepalive_s is set, universes that did not change are flushed
+    again once this delay is elapsed.
+    """
+
+    def __init__(self, universes: int = 1, keepalive_s: float = None):
+        if universes < 1:
+            raise ValueError(f"Invalid universe count: {universes}")
+
+        self.universe_count = universes
+
+        self._frame         = bytearray(universes*DMX_UNIVERSE_SIZE)
+        self._frame_flushed = bytearray(universes*DMX_UNIVERSE_SIZE) # Frame as of last universe flush
+        self.frame          = memoryview(self._frame)
+
+        self.keepalive_s    = keepalive_s
+        self._tstamp_flush  = [float("-inf")] * universes # Last flush time of each universe
+
+    # ─────────────── Channels ─────────────── #
 
-    def ch_set(self, ch: int, value: int):
-        if (ch < 0) or (ch >= 512):
+    def ch_set(self, ch: int, value: int, universe: int = 0):
+        if (ch < 0) or (ch >= DMX_UNIVERSE_SIZE):
             raise ValueError(f"DMX Channel out of bounds: {ch}")
+        if (universe < 0) or (universe >= self.universe_count):
+            raise ValueError(f"DMX Universe out of bounds: {universe}")
         if (value < 0) or (value > 255):
             raise ValueError(f"DMX Value out of bounds: {value}")
 
-        self._on_ch_set(ch, value)
+        self._frame[universe*DMX_UNIVERSE_SIZE+ch] = value
+
+    def ch_get(self, ch: int, universe: int = 0):
+        return self._frame[universe*DMX_UNIVERSE_SIZE+ch]
+
+    # ─────────────── Universes ────────────── #
+
+    def universe(self, idx: int):
+        return self.frame[idx*DMX_UNIVERSE_SIZE:(idx+1)*DMX_UNIVERSE_SIZE]
+
+    def dirty(self, idx: int):
+        """
+        Returns True when the universe changed since it was last flushed.
+        """
+
+        start, end = idx*DMX_UNIVERSE_SIZE, (idx+1)*DMX_UNIVERSE_SIZE
+        return self._frame[start:end] != self._frame_flushed[start:end]
+
+    # ──────────────── Flush ───────────────── #
+
+    def flush(self):
+        self._on_flush(self.frame)
+
+    def _on_flush(self, frame: memoryview):
+        # Default behaviour: flush each universe that changed, or that needs
+        # to be kept alive. Universes never flushed are always sent.
+        tstamp      = time.monotonic()
+        keepalive_s = float("inf") if self.keepalive_s is None else self.keepalive_s
+
+        for idx in range(self.universe_count):
+            if self.dirty(idx) or ((tstamp - self._tstamp_flush[idx]) >= keepalive_s):
+                self._universe_flush(idx, tstamp)
+
+    def _universe_flush(self, idx: int, tstamp: float):
+        start, end = idx*DMX_UNIVERSE_SIZE, (idx+1)*DMX_UNIVERSE_SIZE
+
+        self._on_universe_flush(idx, self.frame[start:end])
+        self._frame_flushed[start:end] = self._frame[start:end]
+        self._tstamp_flush[idx]        = tstamp
+
+    def _universes_expire(self):
+        """
+        Forces all universes to be sent on next flush
+        """
+
+        self._tstamp_flush = [float("-inf")] * self.universe_count
 
     @abstractmethod
-    def _on_ch_set(self, ch: int, value: int):
+    def _on_universe_flush(self, idx: int, data: memoryview):
         pass
-
@@ -0,0 +1,267 @@
+"""
+┌────────────────────────────┐
+│ Vectorized DMX fade engine │
+└────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import numpy as np
+
+from pyshow.dmx.controller import DMX_Controller
+
+
+# ┌────────────────────────────────────────┐
+# │ Fade_Engine_DMX class                  │
+# └────────────────────────────────────────┘
+
+class Fade_Engine_DMX:
+    """
+    Runs the fades of a controller in parallel NumPy arrays. Each step
+    interpolates all of them at once, converts the values to channel values, and
+    scatters them into the controller frame buffer.
+
+    Fade functions using the engine only mark their fade as alive when updated;
+    step() must be called once all the functions are updated, for instance as a
+    Show_Runner hook. Fades not marked during a step are stopped where they are,
+    as a function that is not updated anymore would do.
+
+    Interfaces are not set while their fade runs: use value() to get the current
+    value. The final value is set on the interface when the fade completes.
+    """
+
+    CAPACITY_MIN = 64
+
+    def __init__(self, controller: DMX_Controller):
+        self.controller   = controller
+
+        self._out         = np.frombuffer(controller.frame, dtype=np.uint8)
+
+        self._owners      = []     # Function owning each row, None if free
+        self._interfaces  = []     # Interface of each row
+        self._rows        = dict() # id(interface) -> row
+        self._free        = []     # Free rows
+
+        self._tstamp_last = None
+
+        self._luts        = [None]  # Lookup tables of curves, 0 is linear
+        self._curve_idx   = dict()  # Curve -> lookup table index
+
+        # Fade parameters, one row per fade
+        self._v_start     = np.empty(0)
+        self._v_end       = np.empty(0)
+        self._v_last      = np.empty(0)                # Last computed value
+        self._t_start     = np.empty(0)
+        self._t_end       = np.empty(0)
+        self._seen        = np.empty(0)                # Last step the row was marked in, NaN if never
+        self._min         = np.empty(0)
+        self._max         = np.empty(0)
+        self._full        = np.empty(0)                # Full scale channel value
+        self._invert      = np.empty(0, dtype=bool)
+        self._m16         = np.empty(0, dtype=bool)    # Row drives a 16 bits channel pair
+        self._ch_hi       = np.empty(0, dtype=np.intp) # Absolute index of (msb) channel
+        self._ch_lo       = np.empty(0, dtype=np.intp) # Absolute index of lsb channel
+        self._shift       = np.empty(0, dtype=np.intp)
+        self._curve       = np.empty(0, dtype=np.intp) # Lookup table index
+
+        self._alloc(self.CAPACITY_MIN)
+
+
+    def _alloc(self, capacity: int):
+        def grow(arr, fill):
+            new_arr = np.full(capacity, fill, dtype=arr.dtype)
+            new_arr[:len(arr)] = arr
+            return new_arr
+
+        prev = len(self._owners)
+
+        self._v_start = grow(self._v_start, 0.0)
+        self._v_end   = grow(self._v_end,   0.0)
+        self._v_last  = grow(self._v_last,  0.0)
+        self._t_start = grow(self._t_start, 0.0)
+        self._t_end   = grow(self._t_end,   0.0)
+        self._seen    = grow(self._seen,    np.nan)
+        self._min     = grow(self._min,     0.0)
+        self._max     = grow(self._max,     1.0)
+        self._full    = grow(self._full,    0.0)
+        self._invert  = grow(self._invert,  False)
+        self._m16     = grow(self._m16,     False)
+        self._ch_hi   = grow(self._ch_hi,   0)
+        self._ch_lo   = grow(self._ch_lo,   0)
+        self._shift   = grow(self._shift,   0)
+        self._curve   = grow(self._curve,   0)
+
+        self._owners     += [None] * (capacity-prev)
+        self._interfaces += [None] * (capacity-prev)
+        self._free       += reversed(range(prev, capacity))
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Fades management                       │
+    # └────────────────────────────────────────┘
+
+    def add(self, owner, interface, v_start: float, v_end: float, t_start: float, t_end: float, curve = None):
+        """
+        Starts a fade of the given RangeValue interface, linear if curve is None.
+        A fade already running on the same interface is replaced. Returns the
+        row, to be given to mark().
+        """
+
+        controller, idxs, full = interface.dmx_slot()
+        if controller is not self.controller:
+            raise ValueError("Interface is not driven by the engine controller")
+
+        row = self._rows.get(id(interface))
+        if row is None:
+            if not self._free:
+                self._alloc(2*len(self._owners))
+
+            row                         = self._free.pop()
+            self._rows[id(interface)]   = row
+            self._interfaces[row]       = interface
+
+        self._owners[row]  = owner
+
+        self._v_start[row] = v_start
+        self._v_end[row]   = v_end
+        self._v_last[row]  = v_start
+        self._t_start[row] = t_start
+        self._t_end[row]   = t_end
+        self._seen[row]    = np.nan
+        self._min[row]     = interface.min
+        self._max[row]     = interface.max
+        self._full[row]    = full
+        self._invert[row]  = interface.invert
+        self._m16[row]     = len(idxs) > 1
+        self._ch_hi[row]   = idxs[0]
+        self._ch_lo[row]   = idxs[-1]
+        self._shift[row]   = 8 if len(idxs) > 1 else 0
+        self._curve[row]   = self._curve_lut(curve)
+
+        return row
+
+
+    def _curve_lut(self, curve):
+        if curve is None:
+            return 0
+
+        idx = self._curve_idx.get(curve)
+        if idx is None:
+            idx                    = len(self._luts)
+            self._curve_idx[curve] = idx
+            self._luts.append(np.array(curve.lut))
+
+        return idx
+
+
+    def mark(self, row: int, owner, timestamp: float):
+        """
+        Marks the fade as alive for the step at given timestamp. Returns False if
+        the row is not owned anymore by owner (fade completed or replaced).
+        """
+
+        if self._owners[row] is not owner:
+            return False
+
+        self._seen[row] = timestamp
+        return True
+
+
+    def value(self, interface, timestamp: float):
+        """
+        Current value of the interface, taking a running fade into account.
+        """
+
+        row = self._rows.get(id(interface))
+        if row is None:
+            return interface.get()
+
+        v = self._interpolate(np.array([row]), timestamp)
+        return float(v[0])
+
+
+    def _release(self, rows, values):
+        # Set final values on interfaces, and free rows
+        for row, v in zip(rows.tolist(), values.tolist()):
+            itf = self._interfaces[row]
+            itf.set(v)
+
+            del self._rows[id(itf)]
+            self._owners[row]     = None
+            self._interfaces[row] = None
+            self._seen[row]       = np.nan
+            self._free.append(row)
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Step                                   │
+    # └────────────────────────────────────────┘
+
+    def _interpolate(self, rows, timestamp: float):
+        # Same computation as Function_Fade, target value when the fade is over
+        t_start = self._t_start[rows]
+        t_end   = self._t_end  [rows]
+        v_start = self._v_start[rows]
+        v_end   = self._v_end  [rows]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = (v_end-v_start)/(t_end-t_start)
+            v     = np.where(timestamp < t_end, delta*(timestamp-t_start) + v_start, v_end)
+
+            # Curved fades, evaluated like Curve.__call__
+            curves = self._curve[rows]
+            for idx in np.unique(curves[curves > 0]).tolist():
+                lut   = self._luts[idx]
+                m     = (curves == idx) & (timestamp < t_end)
+
+                x     = np.clip((timestamp-t_start[m])/(t_end[m]-t_start[m]), 0.0, 1.0)
+                pos   = x*(len(lut)-1)
+                i     = np.minimum(pos.astype(np.intp), len(lut)-2)
+                y     = lut[i] + (lut[i+1]-lut[i])*(pos-i)
+
+                v[m]  = v_start[m] + (v_end[m]-v_start[m])*y
+
+        return np.clip(v, self._min[rows], self._max[rows])
+
+
+    def step(self, timestamp: float):
+        """
+        Computes the fades marked at given timestamp, and writes them into the
+        controller frame buffer. Calling it again with the same timestamp does
+        nothing.
+        """
+
+        if timestamp == self._tstamp_last:
+            return
+        self._tstamp_last = timestamp
+
+        # Stop fades that were not updated. Fades never marked yet are kept, as
+        # they may have been added after their function update.
+        stale = np.flatnonzero(~np.isnan(self._seen) & (self._seen != timestamp))
+        if stale.size:
+            self._release(stale, self._v_last[stale])
+
+        rows = np.flatnonzero(self._seen == timestamp)
+        if not rows.size:
+            return
+
+        v                  = self._interpolate(rows, timestamp)
+        self._v_last[rows] = v
+
+        # Convert to channel values, same formula as DMX interfaces
+        v_max  = self._max[rows]
+        v_out  = np.where(self._invert[rows], v_max-v, v)
+        code   = (((v_out-self._min[rows])/v_max)*self._full[rows]).astype(np.int64)
+        np.clip(code, 0, self._full[rows].astype(np.int64), out=code)
+
+        self._out[self._ch_hi[rows]] = code >> self._shift[rows]
+
+        m16 = self._m16[rows]
+        if m16.any():
+            self._out[self._ch_lo[rows[m16]]] = code[m16] & 0xFF
+
+        # Completed fades
+        done = timestamp > self._t_end[rows]
+        if done.any():
+            self._release(rows[done], v[done])
@@ -10,7 +10,7 @@
 from dataclasses           import dataclass, field, InitVar
 from pyshow.core.fixtures  import Fixture
 
-from pyshow.dmx.controller import DMX_Controller
+from pyshow.dmx.controller import DMX_Controller, DMX_UNIVERSE_SIZE
 
 from typing                import Dict
 
@@ -29,14 +29,46 @@ class Fixture_DMX(Fixture):
 
     interfaces: Dict[str, any]
 
+    universe: int = 0
+
     # ──────────── Post init hook ──────────── #
     
     def __post_init__(self, transport):
+        if (self.universe < 0) or (self.universe >= transport.universe_count):
+            raise ValueError(f"Universe {self.universe} not handled by transport")
+        if (self.channel_start < 0) or (self.channel_start >= DMX_UNIVERSE_SIZE):
+            raise ValueError(f"DMX Channel out of bounds: {self.channel_start}")
+
         self._transport = transport
+        self._ch_base   = self.universe*DMX_UNIVERSE_SIZE + self.channel_start # Shared by interfaces
         super().__post_init__()
 
 
     # ────────── Shorthand functions ───────── #
 
+    @property
+    def controller(self):
+        return self._transport
+
+    @property
+    def ch_base(self):
+        """
+        Absolute index of the first channel of the fixture in the controller
+        frame buffer
+        """
+
+        return self._ch_base
+
     def ch_set(self, offset, value):
-        self._transport.ch_set(self.channel_start+offset, value)
+        self._transport.ch_set(self.channel_start+offset, value, self.universe)
+
+    def ch_index(self, offset):
+        """
+        Absolute index of given channel in the controller frame buffer
+        """
+
+        ch = self.channel_start+offset
+        if (ch < 0) or (ch >= DMX_UNIVERSE_SIZE):
+            raise ValueError(f"DMX Channel out of bounds: {ch}")
+
+        return self._ch_base + offset
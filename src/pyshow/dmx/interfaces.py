@@ -8,6 +8,7 @@
 """
 
 from pyshow.core.interfaces import (
+    AtomicValue,
     RangeValue,
 
     DiscreteValue_Choice,
@@ -15,18 +16,123 @@ from pyshow.core.interfaces import (
 )
 
 from pyshow.dmx.fixtures import (Fixture_DMX)
+from pyshow.dmx.mapping  import (
+    Frame_Unbound,
+    FRAME_NOT_ATTACHED,
+    FRAME_NOT_DMX,
+    Channel_Mapper_Array
+)
 
+from abc         import ABC, abstractmethod
 from dataclasses import dataclass, field
 
-from typing import Optional, Dict
+from typing import Optional, Dict, ClassVar, Tuple
+
+
+# ┌────────────────────────────────────────┐
+# │ MappedValue_DMX mixin                  │
+# └────────────────────────────────────────┘
+
+class MappedValue_DMX(ABC):
+    """
+    Binds the interface to the controller frame buffer when it is attached to a
+    fixture: channels are checked once, and values are then written straight
+    into the frame, at the fixture first channel index plus the channel field.
+
+    Interfaces only hold a reference to the controller frame and to the first
+    channel index shared by all the interfaces of the fixture, so that bound
+    interfaces take no more memory than unbound ones. Unbound interfaces hold a
+    shared frame raising the binding error when written.
+
+    Bindings are checked from the channel fields: assign the fixture again if
+    they are modified.
+
+    The mixin cannot hold slots, as the interface base class already has some:
+    the binding slots are declared by the _RangeValue_Mapped and
+    _DiscreteValue_Mapped bases.
+    """
+
+    __slots__ = ()
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._frame = FRAME_NOT_ATTACHED
+        self._base  = 0
+
+    # ─────────────── Fixture ──────────────── #
+
+    @property
+    def fixture(self):
+        return AtomicValue.fixture.fget(self)
+
+    @fixture.setter
+    def fixture(self, fixt):
+        AtomicValue.fixture.fset(self, fixt)
+
+        if fixt is None:
+            self._frame, self._base = FRAME_NOT_ATTACHED, 0
+        elif not isinstance(fixt, Fixture_DMX):
+            self._frame, self._base = FRAME_NOT_DMX, 0
+        else:
+            self._dmx_check(fixt)
+            self._frame, self._base = fixt.controller.frame, fixt.ch_base
+
+    @abstractmethod
+    def _dmx_channels(self) -> Tuple[int, ...]:
+        """
+        Channels of the interface, relative to the fixture first channel (msb
+        first)
+        """
+
+    def _dmx_check(self, fixt: Fixture_DMX):
+        # Raises if the interface cannot be driven by given fixture
+        for ch in self._dmx_channels():
+            fixt.ch_index(ch)
+
+    # ─────────────── Output slot ──────────── #
+
+    def dmx_slot(self):
+        """
+        Returns the controller, absolute channel indexes and full scale value,
+        for code writing directly into the controller frame buffer.
+        """
+
+        if isinstance(self._frame, Frame_Unbound):
+            raise ValueError(self._frame.reason)
+
+        return self.fixture.controller, tuple(self._base+ch for ch in self._dmx_channels()), self._full
+
+    # ───────────────── Hooks ──────────────── #
+
+    @staticmethod
+    def _array_output(interfaces):
+        return Channel_Mapper_Array(interfaces)
+
+
+# ┌────────────────────────────────────────┐
+# │ Mapped base classes                    │
+# └────────────────────────────────────────┘
+
+class _RangeValue_Mapped(RangeValue):
+    __slots__ = (
+        "_frame", # Controller frame buffer
+        "_base",  # Absolute index of the fixture first channel
+    )
+
+
+class _DiscreteValue_Mapped(DiscreteValue):
+    __slots__ = (
+        "_frame", # Controller frame buffer
+        "_base",  # Absolute index of the fixture first channel
+    )
 
 
 # ┌────────────────────────────────────────┐
 # │ 8BitsRangeValue class                  │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
-class RangeValue_DMX_8Bits(RangeValue):
+@dataclass(kw_only=True, slots=True)
+class RangeValue_DMX_8Bits(MappedValue_DMX, _RangeValue_Mapped):
     channel: int
 
     min: float
@@ -36,30 +142,29 @@ class RangeValue_DMX_8Bits(RangeValue):
 
     class_id: str = "RangeValue_DMX_8Bits"
 
+    _full: ClassVar[int] = (1<<8)-1
+
     # ─────────────── Post init ────────────── #
 
     def __post_init__(self):
-        super().__post_init__()
+        super(RangeValue_DMX_8Bits, self).__post_init__()
 
 
-    # ───────────────── Hooks ──────────────── #
+    # ──────────────── Output ──────────────── #
+
+    def _dmx_channels(self):
+        return (self.channel,)
 
     def _on_set(self, v):
-        if self.fixture is None:
-            raise ValueError("No DMX fixture attached")
-        elif not isinstance(self.fixture, Fixture_DMX):
-            raise ValueError("Attached fixture is not DMX compatible.")
+        self._frame[self._base+self.channel] = int(((v-self.min)/self.max)*((1<<8)-1))
 
-        v_byte = ((v-self.min)/self.max)*((1<<8)-1)
-        self.fixture.ch_set(self.channel, int(v_byte))
-    
 
 # ┌────────────────────────────────────────┐
 # │ 16BitsRangeValue class value           │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
-class RangeValue_DMX_16Bits(RangeValue):
+@dataclass(kw_only=True, slots=True)
+class RangeValue_DMX_16Bits(MappedValue_DMX, _RangeValue_Mapped):
     channel_msb: int
     channel_lsb: int
 
@@ -70,42 +175,50 @@ class RangeValue_DMX_16Bits(RangeValue):
 
     class_id: str = "RangeValue_DMX_16Bits"
 
+    _full: ClassVar[int] = (1<<16)-1
+
 
     # ─────────────── Post init ────────────── #
     
     def __post_init__(self):
-        super().__post_init__()
+        super(RangeValue_DMX_16Bits, self).__post_init__()
 
 
-    # ───────────────── Hooks ──────────────── #
-    
-    def _on_set(self, v):
-        if self.fixture is None:
-            raise ValueError("No DMX fixture attached")
-        elif not isinstance(self.fixture, Fixture_DMX):
-            raise ValueError("Attached fixture is not DMX compatible.")
+    # ──────────────── Output ──────────────── #
+
+    def _dmx_channels(self):
+        return (self.channel_msb, self.channel_lsb)
 
-        v_short = ((v-self.min)/self.max)*((1<<16)-1)
-        self.fixture.ch_set(self.channel_msb, (int(v_short)>>8))
-        self.fixture.ch_set(self.channel_lsb, (int(v_short) & 0xFF))
+    def _on_set(self, v):
+        v_short                                  = int(((v-self.min)/self.max)*((1<<16)-1))
+        self._frame[self._base+self.channel_msb] = v_short >> 8
+        self._frame[self._base+self.channel_lsb] = v_short & 0xFF
 
 
 # ┌────────────────────────────────────────┐
 # │ DiscreteValue_DMX class                │
 # └────────────────────────────────────────┘
 
-@dataclass(kw_only=True)
-class DiscreteValue_DMX_8Bits(DiscreteValue):
+@dataclass(kw_only=True, slots=True)
+class DiscreteValue_DMX_8Bits(MappedValue_DMX, _DiscreteValue_Mapped):
     channel: int
 
     choices: Dict[str, DiscreteValue_Choice]
     class_id: str = "DiscreteValue_DMX_8Bits"
 
-    
+    _full: ClassVar[int] = (1<<8)-1
+
+    # ──────────────── Output ──────────────── #
+
+    def _dmx_channels(self):
+        return (self.channel,)
+
+    def _dmx_check(self, fixt: Fixture_DMX):
+        super(DiscreteValue_DMX_8Bits, self)._dmx_check(fixt)
+
+        for name, choice in self.choices.items():
+            if (int(choice.value) < 0) or (int(choice.value) > 255):
+                raise ValueError(f"DMX Value out of bounds for choice {name}: {choice.value}")
+
     def _on_set(self, v):
-        if self.fixture is None:
-            raise ValueError("No DMX fixture atteched")
-        elif not isinstance(self.fixture, Fixture_DMX):
-            raise ValueError("Attached fixture is not DMX compatible")
-        
-        self.fixture.ch_set(self.channel, int(self.choices[v].value))
+        self._frame[self._base+self.channel] = int(self.choices[v].value)
@@ -0,0 +1,90 @@
+"""
+┌────────────────────────────────────┐
+│ Channel mappers for DMX interfaces │
+└────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import numpy as np
+
+from typing import List
+
+
+# ┌────────────────────────────────────────┐
+# │ Unbound frame                          │
+# └────────────────────────────────────────┘
+
+class Frame_Unbound:
+    """
+    Frame of an interface that is not attached to a DMX fixture: writing to it
+    raises the error given when binding failed. Shared by all unbound
+    interfaces.
+    """
+
+    __slots__ = ("reason",)
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def __setitem__(self, idx, v):
+        raise ValueError(self.reason)
+
+
+FRAME_NOT_ATTACHED = Frame_Unbound("No DMX fixture attached")
+FRAME_NOT_DMX      = Frame_Unbound("Attached fixture is not DMX compatible.")
+
+
+# ┌────────────────────────────────────────┐
+# │ Array mapper                           │
+# └────────────────────────────────────────┘
+
+class Channel_Mapper_Array:
+    """
+    Vector counterpart of the DMX range interfaces outputs: converts an array
+    of values, one per interface, and scatters the channel values into the
+    controller frame buffers at once. Like the scalar outputs, raises a
+    ValueError when a value falls outside the channel range.
+
+    Values are converted as ((v-min)/max)*full.
+    """
+
+    def __init__(self, interfaces: List["RangeValue"]):
+        slots       = [itf.dmx_slot() for itf in interfaces] # Raises for unbound interfaces
+
+        self.offset = np.array([itf.min   for itf in interfaces], dtype=float)
+        self.div    = np.array([itf.max   for itf in interfaces], dtype=float)
+        self.full   = np.array([full for controller, idxs, full in slots], dtype=np.int64)
+
+        # One part per controller
+        parts = dict()
+        for pos, (controller, idxs, full) in enumerate(slots):
+            parts.setdefault(controller, []).append((pos, idxs))
+
+        self._parts = []
+        for controller, members in parts.items():
+            pos     = np.array([p for p, idxs in members], dtype=np.intp)
+            m16     = np.array([len(idxs) > 1 for p, idxs in members], dtype=bool)
+
+            self._parts.append((
+                np.frombuffer(controller.frame, dtype=np.uint8),
+                pos,
+                np.array([idxs[0] for p, idxs in members], dtype=np.intp), # (msb) channels
+                np.where(m16, 8, 0),                                        # Shift of (msb) channels
+                m16,
+                np.array([idxs[-1] for p, idxs in members if len(idxs) > 1], dtype=np.intp),
+            ))
+
+    def set(self, values: np.ndarray):
+        code = (((values-self.offset)/self.div)*self.full).astype(np.int64)
+        bad  = (code < 0) | (code > self.full)
+        if bad.any():
+            pos = int(np.argmax(bad))
+            raise ValueError(f"DMX value out of range: {values[pos]} -> {code[pos]} not in [0, {self.full[pos]}]")
+
+        for frame, pos, ch_hi, shift, m16, ch_lo in self._parts:
+            part_code        = code[pos]
+            frame[ch_hi]     = part_code >> shift
+            if ch_lo.size:
+                frame[ch_lo] = part_code[m16] & 0xFF
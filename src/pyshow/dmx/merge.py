@@ -0,0 +1,367 @@
+"""
+┌──────────────────────────┐
+│ HTP/LTP DMX merge engine │
+└──────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import itertools
+
+import numpy as np
+
+from enum                   import IntEnum
+from typing                 import List, Callable, Iterable
+
+from pyshow.core.clock      import Clock, CLOCK_MONOTONIC
+from pyshow.core.curves     import Curve
+from pyshow.core.interfaces import GroupValue
+from pyshow.dmx.controller  import DMX_Controller
+
+
+# ┌────────────────────────────────────────┐
+# │ Merge rules                            │
+# └────────────────────────────────────────┘
+
+class Merge_Rule(IntEnum):
+    LTP = 0 # Latest takes precedence: highest priority layer, then latest activated
+    HTP = 1 # Highest takes precedence: highest value of all layers
+
+
+# ┌────────────────────────────────────────┐
+# │ Merge_Layer class                      │
+# └────────────────────────────────────────┘
+
+class Merge_Layer:
+    """
+    Items (scenes, sequences, choosers...) rendered together into their own
+    frame buffer. The layer controls the channels of the interfaces driven by
+    its items' functions; other channels are left to the other layers.
+
+    Hooks are called after the items are updated, while the layer is rendered:
+    a fade engine stepping the layer fades goes there.
+    """
+
+    def __init__(self, items: List[any] = None, priority: int = 0,
+        hooks: List[Callable[[float], None]] = None):
+
+        self.priority    = priority
+        self.hooks       = hooks or []
+
+        self.active      = False
+        self._activation = 0    # Activation order, for LTP
+
+        self._buffer     = None # Set when added to an engine
+        self._mask       = None # Channels controlled by the layer
+
+        self._level      = 1.0  # Crossfade level, for HTP channels
+        self._fade_from  = None # Layer being crossfaded from, for LTP channels
+
+        self.items       = items or []
+
+    @property
+    def items(self):
+        return self._items
+
+    @items.setter
+    def items(self, items: List[any]):
+        self._items = items
+        self._mask  = None # Computed again on next render
+
+
+    def interfaces(self):
+        """
+        Atomic interfaces driven by the functions of the items
+        """
+
+        def walk_functions(functions):
+            for fkt in functions:
+                if hasattr(fkt, "interfaces"): yield from fkt.interfaces # Group functions
+                else:                          yield fkt.interface
+
+        def walk_items(items):
+            for item in items:
+                if   hasattr(item, "functions"): yield from walk_functions(item.functions)
+                elif hasattr(item, "steps"    ): yield from walk_items(item.steps)
+                elif hasattr(item, "scenes"   ): yield from walk_items(item.scenes.values())
+
+        def walk_itf(itf):
+            if   itf is None:                 return
+            elif isinstance(itf, GroupValue): yield from itertools.chain.from_iterable(map(walk_itf, itf.children()))
+            else:                             yield itf
+
+        return list(itertools.chain.from_iterable(map(walk_itf, walk_items(self._items))))
+
+
+# ┌────────────────────────────────────────┐
+# │ Merge_Engine_DMX class                 │
+# └────────────────────────────────────────┘
+
+class Merge_Engine_DMX:
+    """
+    Merge stage between functions and a controller. Each tick, active layers are
+    rendered one after the other: the controller frame is loaded with the layer
+    buffer, the layer items are updated (writing into the frame as usual), and
+    the frame is saved back to the layer buffer. Layers are then merged into the
+    controller frame, channel by channel:
+
+    - LTP channels take the value of the highest priority layer controlling them,
+      the latest activated one for equal priorities.
+    - HTP channels take the highest value of the layers controlling them.
+
+    Channels not controlled by any active layer are left as they are, so that
+    values set directly on interfaces, or by a fade engine running alongside,
+    are kept. Channels of released layers are set to 0 once, or faded out by
+    a crossfade. The engine is updated like a scene, for instance as the item
+    of a Show_Runner.
+
+    A layer can be crossfaded into another one: both keep rendering, and their
+    buffers are blended until the fade ends and the old layer is released.
+    """
+
+    def __init__(self, controller: DMX_Controller, layers: List[Merge_Layer] = None,
+        rule_default: Merge_Rule = Merge_Rule.LTP, clock: Clock = None):
+
+        self.controller  = controller
+        self.clock       = clock or CLOCK_MONOTONIC
+        self.layers      = []
+
+        self._frame      = np.frombuffer(controller.frame, dtype=np.uint8)
+        self._htp        = np.full(len(self._frame), rule_default == Merge_Rule.HTP)
+        self._out        = np.zeros(len(self._frame), dtype=np.uint8)
+        self._htp_val    = np.zeros(len(self._frame), dtype=np.uint8)
+        self._controlled = np.zeros(len(self._frame), dtype=bool)
+        self._released   = np.zeros(len(self._frame), dtype=bool)
+        self._base       = np.zeros(len(self._frame), dtype=np.uint8) # Frame before rendering
+
+        # Crossfades scratch buffers
+        self._target     = np.zeros(len(self._frame), dtype=np.uint8)
+        self._blend      = np.zeros(len(self._frame), dtype=np.float32)
+        self._blend_mask = np.zeros(len(self._frame), dtype=bool)
+
+        self._fades      = dict() # Incoming layer -> (outgoing layer, t_start, duration_s, curve)
+
+        self._activation = itertools.count(1)
+
+        for layer in (layers or []):
+            self.layer_add(layer)
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Layers                                 │
+    # └────────────────────────────────────────┘
+
+    def layer_add(self, layer: Merge_Layer, active: bool = False):
+        layer._buffer = np.zeros(len(self._frame), dtype=np.uint8)
+        self.layers.append(layer)
+
+        if active:
+            self.activate(layer)
+
+        return layer
+
+    def layer_new(self, items: List[any] = None, priority: int = 0,
+        hooks: List[Callable[[float], None]] = None):
+
+        return self.layer_add(Merge_Layer(items, priority, hooks))
+
+    def activate(self, layer: Merge_Layer):
+        layer.active      = True
+        layer._activation = next(self._activation)
+
+    def release(self, layer: Merge_Layer):
+        layer.active      = False
+        self._fade_stop(layer)
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Crossfades                             │
+    # └────────────────────────────────────────┘
+
+    def crossfade(self, layer_out: Merge_Layer, layer_in: Merge_Layer, duration_s: float,
+        curve: Curve = None):
+        """
+        Activates layer_in over layer_out, and blends from the first to the
+        second in duration_s seconds along curve (linear by default). Channels
+        only controlled by layer_out fade to 0. layer_out is released at the
+        end of the fade.
+        """
+
+        self._fade_stop(layer_out)
+        self._fade_stop(layer_in)
+
+        self.activate(layer_in)
+        if (duration_s <= 0) or (not layer_out.active):
+            self.release(layer_out)
+            return
+
+        self._fades[layer_in] = (layer_out, self.clock.now(), duration_s, curve)
+
+
+    def _fade_stop(self, layer: Merge_Layer):
+        # Stops crossfades the layer takes part in
+        for layer_in, (layer_out, *fade) in list(self._fades.items()):
+            if layer in (layer_in, layer_out):
+                del self._fades[layer_in]
+
+                for ly in (layer_in, layer_out):
+                    ly._level     = 1.0
+                    ly._fade_from = None
+
+
+    def _fades_update(self, timestamp: float):
+        for layer_in, (layer_out, t_start, duration_s, curve) in list(self._fades.items()):
+            x = (timestamp - t_start)/duration_s
+
+            if x >= 1.0:
+                self.release(layer_out)
+            else:
+                k = max(0.0, x)
+                if curve is not None:
+                    k = curve(k)
+
+                layer_in._level     = k
+                layer_in._fade_from = layer_out
+                layer_out._level    = 1.0-k
+
+    def fading(self):
+        return bool(self._fades)
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Rules                                  │
+    # └────────────────────────────────────────┘
+
+    def rule_set(self, interfaces: Iterable[any], rule: Merge_Rule):
+        """
+        Sets merge rule of the channels of given interfaces
+        """
+
+        for itf in interfaces:
+            for atomic in (itf.children() if isinstance(itf, GroupValue) else (itf,)):
+                controller, idxs, full = atomic.dmx_slot()
+                if controller is not self.controller:
+                    raise ValueError("Interface is not driven by the engine controller")
+
+                self._htp[list(idxs)] = (rule == Merge_Rule.HTP)
+
+    def rule_set_name(self, fixtures: Iterable[any], name: str, rule: Merge_Rule):
+        """
+        Sets merge rule of the interface with given name on all fixtures having one,
+        for instance all the "dimmer" interfaces.
+        """
+
+        self.rule_set([fixt.interfaces[name] for fixt in fixtures if name in fixt.interfaces], rule)
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Update                                 │
+    # └────────────────────────────────────────┘
+
+    def _mask_build(self, layer: Merge_Layer):
+        mask = np.zeros(len(self._frame), dtype=bool)
+        for itf in layer.interfaces():
+            controller, idxs, full = itf.dmx_slot()
+            if controller is not self.controller:
+                raise ValueError("Interface is not driven by the engine controller")
+
+            mask[list(idxs)] = True
+
+        layer._mask = mask
+
+
+    async def _render(self, layer: Merge_Layer, timestamp: float):
+        if layer._mask is None:
+            self._mask_build(layer)
+
+        self._frame[:] = layer._buffer
+
+        for item in layer.items:
+            await item.update(timestamp)
+        for hook in layer.hooks:
+            hook(timestamp)
+
+        layer._buffer[:] = self._frame
+
+
+    def _merge_ltp(self, out: np.ndarray, layer: Merge_Layer):
+        if layer._fade_from is None:
+            np.copyto(out, layer._buffer, where=layer._mask) # Last one wins
+            return
+
+        # Blend from the merged value below to the layer value, 0 on the
+        # channels of the outgoing layer only.
+        target     = self._target
+        blend      = self._blend
+        blend_mask = self._blend_mask
+
+        target[:]  = 0
+        np.copyto(target, layer._buffer, where=layer._mask)
+        np.logical_or(layer._mask, layer._fade_from._mask, out=blend_mask)
+
+        np.subtract(target, out, out=blend, dtype=np.float32)
+        np.multiply(blend, layer._level, out=blend)
+        np.add     (blend, out, out=blend)
+        np.rint    (blend, out=blend)
+
+        np.copyto(out, blend, where=blend_mask, casting="unsafe")
+
+
+    def _merge_htp(self, htp_val: np.ndarray, layer: Merge_Layer):
+        if layer._level == 1.0:
+            np.maximum(htp_val, layer._buffer, out=htp_val, where=layer._mask)
+            return
+
+        blend = self._blend
+        np.multiply(layer._buffer, layer._level, out=blend, dtype=np.float32)
+        np.rint    (blend, out=blend)
+        np.copyto  (self._target, blend, casting="unsafe")
+
+        np.maximum(htp_val, self._target, out=htp_val, where=layer._mask)
+
+
+    async def update(self, timestamp: float):
+        self._fades_update(timestamp)
+
+        active = sorted(
+            (layer for layer in self.layers if layer.active),
+            key=lambda layer: (layer.priority, layer._activation)
+        )
+
+        self._base[:] = self._frame
+
+        for layer in active:
+            await self._render(layer, timestamp)
+
+        # Merge
+        out        = self._out
+        htp_val    = self._htp_val
+        controlled = self._controlled
+        released   = self._released
+
+        released  [:] = controlled # Controlled at last update
+        out       [:] = 0
+        htp_val   [:] = 0
+        controlled[:] = False
+
+        for layer in active:
+            self._merge_ltp(out, layer)
+            self._merge_htp(htp_val, layer)
+            np.logical_or(controlled, layer._mask, out=controlled)
+
+        np.copyto(out, htp_val, where=self._htp & controlled)
+
+        # Only write controlled channels, and clear the released ones
+        np.logical_and(released, ~controlled, out=released)
+
+        self._frame[:] = self._base
+        np.copyto(self._frame, out, where=controlled)
+        self._frame[released] = 0
+
+
+    def finished(self):
+        return all(
+            all(item.finished() for item in layer.items)
+            for layer in self.layers if layer.active
+        )
@@ -0,0 +1,218 @@
+"""
+┌─────────────────────────────────┐
+│ DMX frame recorder and playback │
+└─────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import logging
+import os
+import struct
+
+import numpy as np
+
+from typing                import Union
+
+from pyshow.core.clock     import Clock, CLOCK_MONOTONIC
+from pyshow.dmx.controller import DMX_Controller
+
+
+# ┌────────────────────────────────────────┐
+# │ File format                            │
+# └────────────────────────────────────────┘
+
+# Header, then fixed size records: little endian float64 timestamp, followed by
+# the frame (all universes).
+
+RECORD_MAGIC       = b"PYSHWDMX"
+RECORD_VERSION     = 1
+
+RECORD_HEADER      = struct.Struct("<8sII") # Magic, version, frame size
+RECORD_TSTAMP      = struct.Struct("<d")
+
+
+def record_dtype(frame_size: int):
+    return np.dtype([("tstamp", "<f8"), ("frame", np.uint8, (frame_size,))])
+
+
+def record_header_read(path: Union[str, os.PathLike]):
+    """
+    Returns the frame size of given record file
+    """
+
+    with open(path, "rb") as fhandle:
+        data = fhandle.read(RECORD_HEADER.size)
+
+    if len(data) < RECORD_HEADER.size:
+        raise ValueError(f"Truncated record file header: {path}")
+
+    magic, version, frame_size = RECORD_HEADER.unpack(data)
+    if magic != RECORD_MAGIC:
+        raise ValueError(f"Not a DMX record file: {path}")
+    if version != RECORD_VERSION:
+        raise ValueError(f"Unsupported record file version: {version}")
+
+    return frame_size
+
+
+# ┌────────────────────────────────────────┐
+# │ Recorder controller                    │
+# └────────────────────────────────────────┘
+
+class DMX_Controller_Recorder(DMX_Controller):
+    """
+    Appends each flushed frame, stamped with the clock time, to a record file.
+    An existing file is appended to, if its frame size matches.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], universes: int = 1, clock: Clock = None):
+        super().__init__(universes)
+
+        self.path    = path
+        self.clock   = clock or CLOCK_MONOTONIC
+
+        self.log     = logging.getLogger(f"DMX recorder to {path}")
+
+        self._file   = None
+        self._record = bytearray(RECORD_TSTAMP.size + len(self.frame))
+
+        # ─────────────── Statistics ───────────── #
+
+        self.frames_recorded = 0
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller hooks                       │
+    # └────────────────────────────────────────┘
+
+    def _on_flush(self, frame: memoryview):
+        if self._file is None:
+            return
+
+        RECORD_TSTAMP.pack_into(self._record, 0, self.clock.now())
+        self._record[RECORD_TSTAMP.size:] = frame
+
+        self._file.write(self._record)
+        self.frames_recorded += 1
+
+    def _on_universe_flush(self, idx: int, data: memoryview):
+        pass
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller specific functions          │
+    # └────────────────────────────────────────┘
+
+    def open(self):
+        self.log.info("Open recorder")
+
+        if os.path.exists(self.path) and (os.path.getsize(self.path) > 0):
+            frame_size = record_header_read(self.path)
+            if frame_size != len(self.frame):
+                raise ValueError(f"Record file frame size is {frame_size}, expected {len(self.frame)}")
+
+            self._file = open(self.path, "ab")
+
+            # Drop a partially written record
+            record_size = len(self._record)
+            extra       = (os.path.getsize(self.path) - RECORD_HEADER.size) % record_size
+            if extra:
+                self._file.truncate(os.path.getsize(self.path) - extra)
+
+        else:
+            self._file = open(self.path, "wb")
+            self._file.write(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, len(self.frame)))
+
+
+    def close(self):
+        if self._file is None:
+            return
+
+        self.log.info("Close recorder")
+
+        self._file.close()
+        self._file = None
+
+
+# ┌────────────────────────────────────────┐
+# │ Playback                               │
+# └────────────────────────────────────────┘
+
+class DMX_Playback:
+    """
+    Plays a record file into a transport frame buffer. The file is memory
+    mapped, and frames are found by a binary search on the timestamps index:
+    updating only copies the frame to play when it changed.
+
+    Playback is updated like a scene: trigger() starts it at the clock time,
+    and update() copies the frame recorded at the same time since start.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], transport: DMX_Controller,
+        loop: bool = False, clock: Clock = None):
+
+        frame_size      = record_header_read(path)
+        if frame_size > len(transport.frame):
+            raise ValueError(f"Recorded frames ({frame_size} channels) do not fit in transport frame")
+
+        self.transport  = transport
+        self.loop       = loop
+        self.clock      = clock or CLOCK_MONOTONIC
+
+        dtype           = record_dtype(frame_size)
+        count           = (os.path.getsize(path) - RECORD_HEADER.size) // dtype.itemsize # Partial last record ignored
+        if count < 1:
+            raise ValueError(f"Empty record file: {path}")
+
+        self.records    = np.memmap(path, dtype=dtype, mode="r", offset=RECORD_HEADER.size, shape=(count,))
+        self.index      = self.records["tstamp"] - self.records["tstamp"][0] # Timestamps since first frame, in memory
+        self.duration_s = float(self.index[-1])
+
+        # Loop period: last frame lasts for the mean frame interval
+        self.period_s   = self.duration_s * len(self.index)/(len(self.index)-1) if len(self.index) > 1 else 0.0
+
+        self._out       = np.frombuffer(transport.frame, dtype=np.uint8)[:frame_size]
+
+        self._t_start   = None
+        self._idx       = None # Index of frame being played
+
+
+    # ─────────────── Lifecycle ────────────── #
+
+    def trigger(self):
+        self.seek(0.0)
+
+    def seek(self, offset_s: float):
+        """
+        Plays from given offset in the record
+        """
+
+        self._t_start = self.clock.now() - offset_s
+        self._idx     = None
+
+    def finished(self):
+        if self._t_start is None:
+            return True
+        elif self.loop:
+            return False
+        return (self.clock.now() - self._t_start) > self.duration_s
+
+    # ──────────────── Update ──────────────── #
+
+    def update_sync(self, timestamp: float):
+        if self._t_start is None:
+            return
+
+        offset = timestamp - self._t_start
+        if self.loop and (self.period_s > 0):
+            offset %= self.period_s
+
+        idx = max(0, int(np.searchsorted(self.index, offset, side="right")) - 1)
+        if idx != self._idx:
+            self._out[:] = self.records["frame"][idx]
+            self._idx    = idx
+
+    async def update(self, timestamp: float):
+        self.update_sync(timestamp)
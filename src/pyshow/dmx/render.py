@@ -0,0 +1,114 @@
+"""
+┌───────────────────────┐
+│ Offline show renderer │
+└───────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import asyncio
+import math
+import os
+
+import numpy as np
+
+from typing                import List, Callable, Union
+
+from pyshow.core.clock     import Clock, Clock_Virtual
+from pyshow.core.runner    import Show_Runner
+from pyshow.dmx.controller import DMX_Controller
+
+
+# ┌────────────────────────────────────────┐
+# │ Null controller                        │
+# └────────────────────────────────────────┘
+
+class DMX_Controller_Null(DMX_Controller):
+    """
+    Controller without output, to patch fixtures of a show being rendered.
+    """
+
+    def _on_flush(self, frame: memoryview):
+        pass
+
+    def _on_universe_flush(self, idx: int, data: memoryview):
+        pass
+
+
+# ┌────────────────────────────────────────┐
+# │ Show_Renderer class                    │
+# └────────────────────────────────────────┘
+
+class Show_Renderer:
+    """
+    Renders a show offline: items (scenes, sequences, choosers...) are updated at
+    the given rate on a virtual clock, and the controller frame is captured after
+    each tick. Nothing sleeps and nothing is sent, so a show renders as fast as
+    its functions can be computed.
+
+    Frame k is captured at clock time t0 + k/rate_hz, t0 being the clock time when
+    rendering starts. The clock is set on the items when the renderer is built,
+    so items should be triggered afterwards.
+    """
+
+    def __init__(self, controller: DMX_Controller, items: List[any], rate_hz: float = 44.0,
+        hooks: List[Callable[[float], None]] = None, clock: Clock = None):
+
+        self.controller = controller
+        self.clock      = clock or Clock_Virtual()
+
+        if self.clock.realtime:
+            raise ValueError("Rendering needs a virtual clock")
+
+        self.runner     = Show_Runner(rate_hz=rate_hz, items=items, hooks=hooks, clock=self.clock)
+
+
+    def frame_count(self, duration_s: float):
+        # Small tolerance, so that 1.0s at 10Hz gives 10 frames, not 11
+        return max(0, math.ceil(duration_s/self.runner.period_s - 1e-9))
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Render                                 │
+    # └────────────────────────────────────────┘
+
+    def render(self, duration_s: float, out: Union[str, os.PathLike, np.ndarray] = None):
+        """
+        Renders duration_s seconds of show. Returns a (frames, channels) uint8
+        array: in memory when out is None, the out array itself when it is one,
+        or a memory mapped .npy file when out is a path.
+        """
+
+        return asyncio.run(self.render_async(duration_s, out))
+
+
+    async def render_async(self, duration_s: float, out: Union[str, os.PathLike, np.ndarray] = None):
+        shape = (self.frame_count(duration_s), len(self.controller.frame))
+
+        if out is None:
+            frames = np.empty(shape, dtype=np.uint8)
+        elif isinstance(out, np.ndarray):
+            if out.shape != shape:
+                raise ValueError(f"Invalid output shape: {out.shape}, expected {shape}")
+            frames = out
+        else:
+            frames = np.lib.format.open_memmap(out, mode="w+", dtype=np.uint8, shape=shape)
+
+        frame    = np.frombuffer(self.controller.frame, dtype=np.uint8)
+        t_start  = self.clock.now()
+        period_s = self.runner.period_s
+
+        for idx in range(shape[0]):
+            # Timestamps are computed, not accumulated, to be reproducible
+            self.clock.set(t_start + idx*period_s)
+
+            await self.runner.tick(self.clock.now())
+            frames[idx] = frame
+
+        self.clock.set(t_start + shape[0]*period_s)
+
+        if isinstance(frames, np.memmap):
+            frames.flush()
+
+        return frames
@@ -0,0 +1,305 @@
+"""
+┌─────────────────────────────────────┐
+│ sACN (ANSI E1.31) output controller │
+└─────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import socket
+import logging
+import time
+import uuid
+
+from typing                import List, Optional, Union
+
+from pyshow.dmx.controller import DMX_Controller, DMX_UNIVERSE_SIZE
+
+
+# ┌────────────────────────────────────────┐
+# │ Constants                              │
+# └────────────────────────────────────────┘
+
+E131_PORT                          = 5568
+E131_DISCOVERY_UNIVERSE            = 64214
+E131_DISCOVERY_INTERVAL_S          = 10.0
+E131_DISCOVERY_PAGE_SIZE           = 512
+
+E131_ACN_PID                       = b"ASC-E1.17\x00\x00\x00"
+
+E131_VECTOR_ROOT_DATA              = 0x00000004
+E131_VECTOR_ROOT_EXTENDED          = 0x00000008
+E131_VECTOR_DATA_PACKET            = 0x00000002
+E131_VECTOR_EXTENDED_DISCOVERY     = 0x00000002
+E131_VECTOR_DMP_SET_PROPERTY       = 0x02
+E131_VECTOR_DISCOVERY_UNIVERSE_LIST= 0x00000001
+
+E131_OPT_PREVIEW                   = 0x80
+E131_OPT_STREAM_TERMINATED         = 0x40
+
+E131_PRIORITY_DEFAULT              = 100
+E131_PRIORITY_MAX                  = 200
+
+# Offsets in data packet
+E131_OFS_PRIORITY                  = 108
+E131_OFS_SEQUENCE                  = 111
+E131_OFS_OPTIONS                   = 112
+E131_OFS_UNIVERSE                  = 113
+E131_OFS_DATA                      = 126
+
+E131_DATA_PACKET_SIZE              = E131_OFS_DATA + DMX_UNIVERSE_SIZE
+
+
+# ┌────────────────────────────────────────┐
+# │ Packet builders                        │
+# └────────────────────────────────────────┘
+
+def _flags_length(size: int):
+    return (0x7000 | size).to_bytes(2, "big")
+
+
+def _root_layer(packet: bytearray, vector: int, cid: bytes):
+    packet[0:2]   = (0x0010).to_bytes(2, "big") # Preamble size
+    packet[2:4]   = (0x0000).to_bytes(2, "big") # Post-amble size
+    packet[4:16]  = E131_ACN_PID
+    packet[16:18] = _flags_length(len(packet)-16)
+    packet[18:22] = vector.to_bytes(4, "big")
+    packet[22:38] = cid
+
+
+def _source_name(name: str):
+    return name.encode("utf-8")[:63].ljust(64, b"\x00")
+
+
+def e131_data_packet(cid: bytes, source_name: str, universe: int, priority: int = E131_PRIORITY_DEFAULT):
+    """
+    Builds a data packet for a full universe, with a zeroed payload.
+    """
+
+    packet = bytearray(E131_DATA_PACKET_SIZE)
+
+    # Root layer
+    _root_layer(packet, E131_VECTOR_ROOT_DATA, cid)
+
+    # Framing layer
+    packet[38:40]   = _flags_length(len(packet)-38)
+    packet[40:44]   = E131_VECTOR_DATA_PACKET.to_bytes(4, "big")
+    packet[44:108]  = _source_name(source_name)
+    packet[108]     = priority
+    packet[109:111] = (0).to_bytes(2, "big") # Synchronization address
+    packet[111]     = 0                      # Sequence
+    packet[112]     = 0                      # Options
+    packet[113:115] = universe.to_bytes(2, "big")
+
+    # DMP layer
+    packet[115:117] = _flags_length(len(packet)-115)
+    packet[117]     = E131_VECTOR_DMP_SET_PROPERTY
+    packet[118]     = 0xa1                                    # Address type & data type
+    packet[119:121] = (0x0000).to_bytes(2, "big")             # First property address
+    packet[121:123] = (0x0001).to_bytes(2, "big")             # Address increment
+    packet[123:125] = (DMX_UNIVERSE_SIZE+1).to_bytes(2, "big") # Property value count
+    packet[125]     = 0x00                                    # DMX start code
+
+    return packet
+
+
+def e131_discovery_packet(cid: bytes, source_name: str, universes: List[int], page: int = 0, last_page: int = 0):
+    """
+    Builds an universe discovery packet, listing the given universes.
+    """
+
+    packet = bytearray(120 + 2*len(universes))
+
+    # Root layer
+    _root_layer(packet, E131_VECTOR_ROOT_EXTENDED, cid)
+
+    # Framing layer
+    packet[38:40]   = _flags_length(len(packet)-38)
+    packet[40:44]   = E131_VECTOR_EXTENDED_DISCOVERY.to_bytes(4, "big")
+    packet[44:108]  = _source_name(source_name)
+    packet[108:112] = bytes(4) # Reserved
+
+    # Universe discovery layer
+    packet[112:114] = _flags_length(len(packet)-112)
+    packet[114:118] = E131_VECTOR_DISCOVERY_UNIVERSE_LIST.to_bytes(4, "big")
+    packet[118]     = page
+    packet[119]     = last_page
+    packet[120:]    = b"".join(u.to_bytes(2, "big") for u in sorted(universes))
+
+    return packet
+
+
+def e131_multicast_address(universe: int):
+    return f"239.255.{(universe>>8)&0xFF}.{universe&0xFF}"
+
+
+# ┌────────────────────────────────────────┐
+# │ Controller class                       │
+# └────────────────────────────────────────┘
+
+class DMX_Controller_sACN(DMX_Controller):
+    """
+    Sends E1.31 data packets over UDP, to the multicast group of each universe
+    or to the given unicast hosts. Packets are built once per universe; flushing
+    only patches their payload and sequence number.
+
+    Each universe has its own sequence counter and priority. A universe discovery
+    packet is sent every discovery_s seconds (None to disable).
+    """
+
+    def __init__(self, universes: int = 1, universe_start: int = 1,
+        hosts: Optional[Union[str, List[str]]] = None, port: int = E131_PORT,
+        priority: int = E131_PRIORITY_DEFAULT, source_name: str = "pyshow",
+        cid: bytes = None, keepalive_s: float = 1.0,
+        discovery_s: Optional[float] = E131_DISCOVERY_INTERVAL_S, multicast_ttl: int = 1):
+
+        super().__init__(universes, keepalive_s)
+
+        if (universe_start < 1) or ((universe_start+universes-1) > 63999):
+            raise ValueError("sACN universes must be in range 1-63999")
+        if (priority < 0) or (priority > E131_PRIORITY_MAX):
+            raise ValueError(f"Invalid sACN priority: {priority}")
+
+        self.universe_start = universe_start
+        self.hosts          = [hosts] if isinstance(hosts, str) else hosts # None: multicast
+        self.port           = port
+        self.source_name    = source_name
+        self.cid            = cid or uuid.uuid4().bytes
+        self.discovery_s    = discovery_s
+        self.multicast_ttl  = multicast_ttl
+
+        self.sock           = None
+
+        self.log            = logging.getLogger(f"sACN controller {self.source_name}")
+
+        self._packets       = [
+            e131_data_packet(self.cid, source_name, universe_start+idx, priority)
+            for idx in range(universes)
+        ]
+
+        self._dests         = [self._destinations(universe_start+idx) for idx in range(universes)]
+        self._sequences     = [0] * universes
+
+        self._tstamp_discovery = float("-inf")
+
+        # ─────────────── Statistics ───────────── #
+
+        self.packets_sent    = 0
+        self.packets_dropped = 0 # Packets that could not be sent
+
+
+    def _destinations(self, universe: int):
+        if self.hosts is None:
+            return [(e131_multicast_address(universe), self.port)]
+        else:
+            return [(host, self.port) for host in self.hosts]
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Priority                               │
+    # └────────────────────────────────────────┘
+
+    def priority_set(self, priority: int, universe: int = None):
+        """
+        Sets priority of given universe index, or of all universes if None.
+        """
+
+        if (priority < 0) or (priority > E131_PRIORITY_MAX):
+            raise ValueError(f"Invalid sACN priority: {priority}")
+
+        idxs = range(self.universe_count) if universe is None else [universe]
+        for idx in idxs:
+            self._packets[idx][E131_OFS_PRIORITY] = priority
+            self._tstamp_flush[idx]               = float("-inf") # Resend now
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller hooks                       │
+    # └────────────────────────────────────────┘
+
+    def _on_flush(self, frame: memoryview):
+        super()._on_flush(frame)
+
+        if self.discovery_s is not None:
+            tstamp = time.monotonic()
+            if (tstamp - self._tstamp_discovery) >= self.discovery_s:
+                self.discovery_send()
+                self._tstamp_discovery = tstamp
+
+
+    def _on_universe_flush(self, idx: int, data: memoryview):
+        packet                    = self._packets[idx]
+        packet[E131_OFS_SEQUENCE] = self._sequences[idx]
+        packet[E131_OFS_DATA:]    = data
+
+        self._sequences[idx]      = (self._sequences[idx]+1) & 0xFF
+
+        self._send(packet, self._dests[idx])
+
+
+    def _send(self, packet: bytearray, dests):
+        if self.sock is None:
+            return
+
+        for dest in dests:
+            try:
+                self.sock.sendto(packet, dest)
+                self.packets_sent += 1
+            except OSError as exc: # BlockingIOError included
+                self.log.debug(f"Failed to send packet to {dest}: {exc}")
+                self.packets_dropped += 1
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller specific functions          │
+    # └────────────────────────────────────────┘
+
+    def discovery_send(self):
+        universes = [self.universe_start+idx for idx in range(self.universe_count)]
+        pages     = [
+            universes[i:i+E131_DISCOVERY_PAGE_SIZE]
+            for i in range(0, len(universes), E131_DISCOVERY_PAGE_SIZE)
+        ]
+
+        if self.hosts is None:
+            dests = [(e131_multicast_address(E131_DISCOVERY_UNIVERSE), self.port)]
+        else:
+            dests = [(host, self.port) for host in self.hosts]
+
+        for page, page_universes in enumerate(pages):
+            self._send(e131_discovery_packet(self.cid, self.source_name, page_universes, page, len(pages)-1), dests)
+
+
+    def open(self):
+        self.log.info("Open controller")
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.multicast_ttl)
+        self.sock.setblocking(False)
+
+        # Send everything on first flush
+        self._universes_expire()
+        self._tstamp_discovery = float("-inf")
+
+
+    def close(self):
+        """
+        Notifies receivers that streams are terminated, then closes the socket.
+        Does nothing if not opened, or already closed.
+        """
+
+        if self.sock is None:
+            return
+
+        self.log.info("Close controller")
+
+        # The standard asks to send three packets with the terminated option
+        for idx, packet in enumerate(self._packets):
+            packet[E131_OFS_OPTIONS] |= E131_OPT_STREAM_TERMINATED
+            for i in range(3):
+                self._on_universe_flush(idx, self.universe(idx))
+            packet[E131_OFS_OPTIONS] &= ~E131_OPT_STREAM_TERMINATED
+
+        self.sock.close()
+        self.sock = None
@@ -7,17 +7,19 @@
  July 2022
 """
 
+import asyncio
 import serial
 import logging
 import time
+import io
+import os
 
 from enum        import IntEnum
 from dataclasses import dataclass, field
 
-from queue       import Queue
-from threading   import Thread, Event
+from threading   import Thread, Event, Condition
 
-from pyshow.dmx.controller import DMX_Controller
+from pyshow.dmx.controller import DMX_Controller, DMX_UNIVERSE_SIZE
 
 
 # ┌────────────────────────────────────────┐
@@ -25,44 +27,227 @@ from pyshow.dmx.controller import DMX_Controller
 # └────────────────────────────────────────┘
 
 class DMX_STM32_Cmd(IntEnum):
-    CH_SET   = 0x00
-    BLACKOUT = 0x01
+    CH_SET    = 0x00
+    BLACKOUT  = 0x01
+    BLOCK_SET = 0x02 # Contiguous channel run
+    FRAME_SET = 0x03 # Whole universe
 
-    OK       = 0x70
-    ERR      = 0x71
+    OK        = 0x70
+    ERR       = 0x71
+
+
+# ───────────── 7 bits packing ───────────── #
+
+# Only 7 bits are available for each payload byte, as the MSB is reserved for
+# framing. Block payloads are packed by groups of 7 bytes: a first byte holds
+# the MSBs of the group, followed by the 7 lower bits of each byte.
+
+def _pack7(data):
+    out = bytearray()
+    for i in range(0, len(data), 7):
+        group = data[i:i+7]
+        out.append(sum(((v>>7)&0x1)<<j for j, v in enumerate(group)))
+        out.extend(v&0x7f for v in group)
+    return bytes(out)
+
+
+def _unpack7(data, count: int):
+    out = bytearray()
+    for i in range(0, len(data), 8):
+        msbs = data[i]
+        out.extend(((msbs>>j)&0x1)<<7 | v for j, v in enumerate(data[i+1:i+8]))
+    return bytes(out[:count])
+
+
+def _pack7_size(count: int):
+    return count + (count+6)//7
 
 
 @dataclass
 class DMX_STM32_Msg:
     cmd:    DMX_STM32_Cmd
-    value0: int
-    value1: int
+    value0: int   = 0
+    value1: int   = 0
+    data:   bytes = b"" # Payload for BLOCK_SET and FRAME_SET commands
 
     # ───────────── Encode/decode ──────────── #
     def to_bytes(self):
-        return bytes([
-            self.cmd.value,
-            self.value0>>2,
-            ((self.value0&0x3)<<5)|(self.value1>>7),
-            self.value1&0x7f
-        ])
+        if self.cmd == DMX_STM32_Cmd.BLOCK_SET:
+            # value0: start channel, followed by channel count on 10 bits
+            count = len(self.data)
+            return bytes([
+                self.cmd.value,
+                self.value0>>2,
+                ((self.value0&0x3)<<5)|(count>>5),
+                count&0x1f
+            ]) + _pack7(self.data)
+
+        elif self.cmd == DMX_STM32_Cmd.FRAME_SET:
+            return bytes([self.cmd.value]) + _pack7(self.data)
+
+        else:
+            return bytes([
+                self.cmd.value,
+                self.value0>>2,
+                ((self.value0&0x3)<<5)|(self.value1>>7),
+                self.value1&0x7f
+            ])
 
     @classmethod
     def from_bytes(cls, data):
-        return None # TODO
-        #return cls(
-        #    cmd    = DMX_STM32_Cmd(data[0]>>1),
-        #    value0 = ((data[0] & 0x1)<<8) | (data[1]&0xFF),
-        #    value1 = (data[2]&0xFF)
-        #)
+        cmd = DMX_STM32_Cmd(data[0]&0x7f)
+
+        if cmd == DMX_STM32_Cmd.BLOCK_SET:
+            count = ((data[2]&0x1f)<<5) | (data[3]&0x1f)
+            return cls(
+                cmd    = cmd,
+                value0 = (data[1]<<2) | (data[2]>>5),
+                data   = _unpack7(data[4:], count)
+            )
+
+        elif cmd == DMX_STM32_Cmd.FRAME_SET:
+            return cls(
+                cmd    = cmd,
+                data   = _unpack7(data[1:], DMX_UNIVERSE_SIZE)
+            )
+
+        else:
+            return cls(
+                cmd    = cmd,
+                value0 = (data[1]<<2) | (data[2]>>5),
+                value1 = ((data[2]&0x1)<<7) | data[3]
+            )
+
+    # ───────────── Wire sizes ─────────────── #
+
+    # Sizes once wrapped (start byte and end marker included)
+    SIZE_CH_SET = 5
+
+    @staticmethod
+    def size_block_set(count: int):
+        return 5 + _pack7_size(count)
+
+    @staticmethod
+    def size_frame_set():
+        return 2 + _pack7_size(DMX_UNIVERSE_SIZE)
 
 
 # ┌────────────────────────────────────────┐
-# │ Controller class                       │
+# │ In place encoder                       │
+# └────────────────────────────────────────┘
+
+_LOW7 = bytes(v&0x7f for v in range(256))
+_MSB  = [bytes(((v>>7)&1)<<j for v in range(256)) for j in range(7)] # MSB moved to bit j
+
+class DMX_STM32_Encoder:
+    """
+    Writes wrapped commands in place into a preallocated buffer, so that a frame
+    is built without any intermediate bytes object.
+    """
+
+    # Worst case: every channel sent using a CH_SET command, plus a blackout
+    SIZE_MAX = DMX_UNIVERSE_SIZE*DMX_STM32_Msg.SIZE_CH_SET + DMX_STM32_Msg.SIZE_CH_SET
+
+    def __init__(self):
+        self._buffer = bytearray(self.SIZE_MAX)
+        self._view   = memoryview(self._buffer)
+        self._pos    = 0
+
+    def reset(self):
+        self._pos = 0
+
+    def view(self):
+        return self._view[:self._pos]
+
+    def __len__(self):
+        return self._pos
+
+    # ─────────────── Commands ─────────────── #
+
+    def ch_set(self, ch: int, value: int):
+        buf, p = self._buffer, self._pos
+        buf[p  ] = DMX_STM32_Cmd.CH_SET | 0x80
+        buf[p+1] = ch>>2
+        buf[p+2] = ((ch&0x3)<<5)|(value>>7)
+        buf[p+3] = value&0x7f
+        buf[p+4] = 0xFF
+        self._pos = p+5
+
+    def blackout(self):
+        buf, p = self._buffer, self._pos
+        buf[p:p+5] = bytes((DMX_STM32_Cmd.BLACKOUT | 0x80, 0, 0, 0, 0xFF))
+        self._pos = p+5
+
+    def block_set(self, start: int, data):
+        count = len(data)
+        buf, p = self._buffer, self._pos
+        buf[p  ] = DMX_STM32_Cmd.BLOCK_SET | 0x80
+        buf[p+1] = start>>2
+        buf[p+2] = ((start&0x3)<<5)|(count>>5)
+        buf[p+3] = count&0x1f
+        self._pos = p+4
+        self._pack7(data)
+
+    def frame_set(self, data):
+        self._buffer[self._pos] = DMX_STM32_Cmd.FRAME_SET | 0x80
+        self._pos += 1
+        self._pack7(data)
+
+    def _pack7(self, data):
+        # Works by columns (j-th byte of each group) instead of by groups. The
+        # MSBs of each column are moved to bit j and summed as big integers,
+        # which never carries as columns do not share any bit.
+        data   = bytes(data)
+        count  = len(data)
+        full   = count//7
+        groups = (count+6)//7
+
+        low    = data.translate(_LOW7)
+        msbs   = sum(
+            int.from_bytes(data[j::7].translate(_MSB[j]), "little") for j in range(7)
+        ).to_bytes(groups, "little")
+
+        buf, p = self._buffer, self._pos
+        end    = p+8*full
+
+        if full:
+            buf[p:end:8] = msbs[:full]
+            for j in range(7):
+                buf[p+1+j:end:8] = low[j:7*full:7]
+
+        # Last incomplete group
+        rem = count-7*full
+        if rem:
+            buf[end]             = msbs[full]
+            buf[end+1:end+1+rem] = low[7*full:]
+            end                 += rem+1
+
+        buf[end]  = 0xFF
+        self._pos = end+1
+
+
+# ┌────────────────────────────────────────┐
+# │ Controller base class                  │
 # └────────────────────────────────────────┘
 
-class DMX_Controller_STM32(DMX_Controller):
-    def __init__(self, path):
+class DMX_Controller_STM32_Base(DMX_Controller):
+    """
+    Device setup, frame diff and encoding shared by the STM32 transports. The
+    way frames are handed to the device is left to subclasses.
+
+    Changes are sent as CH_SET commands, which all firmwares handle. Firmwares
+    supporting BLOCK_SET and FRAME_SET can be given block_cmds=True, to send
+    runs of channels and whole frames in fewer bytes.
+    """
+
+    # Maximum count of unchanged channels included in a block to join two runs
+    BLOCK_GAP_MAX = 4
+
+    def __init__(self, path, block_cmds: bool = False):
+        super().__init__()
+
+        self.block_cmds        = block_cmds # Set to True for firmwares supporting BLOCK_SET and FRAME_SET
+
         self.dev               = serial.serial_for_url(path, do_not_open=True)
 
         self.dev.baudrate      = 576000
@@ -74,29 +259,151 @@ class DMX_Controller_STM32(DMX_Controller):
         self.dev.timeout       = 5
         self.dev.write_timeout = 5
 
-        self.buffer            = bytes()
+        self._encoder          = DMX_STM32_Encoder()
+
+        self._frame_sent       = bytearray(DMX_UNIVERSE_SIZE) # Last frame sent to the device
+        self._resync           = True                         # Send the whole frame on next flush
+
+        self._frame_pending    = bytearray(DMX_UNIVERSE_SIZE) # Latest flushed frame, waiting to be written
+        self._frame_work       = bytearray(DMX_UNIVERSE_SIZE) # Frame being encoded and written
+        self._pending          = False
 
         self.log               = logging.getLogger(f"STM32 controller on {path}")
 
+        # ─────────────── Statistics ───────────── #
+
+        self.frames_sent       = 0 # Frames written to the device
+        self.frames_superseded = 0 # Frames replaced by a newer one before being written
+        self.frames_dropped    = 0 # Frames that failed to be written
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Frame handling                         │
+    # └────────────────────────────────────────┘
+
+    def _pending_set(self, frame: memoryview):
+        if self._pending:
+            self.frames_superseded += 1
+
+        self._frame_pending[:] = frame
+        self._pending          = True
+
+    def _pending_take(self):
+        """
+        Swaps the pending and working frames. Only this needs to be done under
+        the lock of the threaded controller: the working frame, the last frame
+        sent and the encoder belong to the writer alone.
+        """
+
+        self._frame_pending, self._frame_work = self._frame_work, self._frame_pending
+        self._pending = False
+
+    def _work_encode(self):
+        """
+        Encodes the working frame against the last frame sent. Returns the data
+        to write.
+        """
+
+        self._encoder.reset()
+        self._encode(self._encoder, self._frame_work, self._changed(self._frame_work))
+
+        return self._encoder.view()
+
+    def _written(self):
+        self._frame_sent[:] = self._frame_work
+        self._resync        = False
+        self.frames_sent   += 1
+
+    def _write_failed(self, exc: Exception):
+        self.log.error(f"Failed to write frame: {exc}")
+        self._resync         = True # Device state is unknown
+        self.frames_dropped += 1
+
+    def _changed(self, frame: memoryview):
+        """
+        Returns the channels that differ from the last frame sent to the device,
+        or all channels when the device state is unknown.
+        """
+
+        if self._resync:
+            return range(len(frame))
+        elif frame == self._frame_sent:
+            return ()
+        else:
+            return [ch for ch, (v, v_sent) in enumerate(zip(frame, self._frame_sent)) if v != v_sent]
+
+    def _encode(self, encoder: DMX_STM32_Encoder, frame: memoryview, changed):
+        """
+        Chooses the cheapest set of commands to send the changed channels:
+        single channel sets, contiguous blocks or the whole frame.
+        """
+
+        if not changed:
+            return
+        elif not self.block_cmds:
+            for ch in changed: encoder.ch_set(ch, frame[ch])
+            return
+
+        # Group changed channels in runs: [start, end, changed channels]
+        runs = []
+        for ch in changed:
+            if runs and (ch - runs[-1][1] - 1) <= self.BLOCK_GAP_MAX:
+                runs[-1][1] = ch
+                runs[-1][2].append(ch)
+            else:
+                runs.append([ch, ch, [ch]])
+
+        # Choose encoding for each run
+        plan = []
+        size = 0
+        for start, end, chs in runs:
+            size_block  = DMX_STM32_Msg.size_block_set(end-start+1)
+            size_ch_set = DMX_STM32_Msg.SIZE_CH_SET*len(chs)
+
+            if size_block < size_ch_set:
+                size += size_block
+                plan.append((start, end, None))
+            else:
+                size += size_ch_set
+                plan.append((start, end, chs))
+
+        # Whole frame is cheaper?
+        if DMX_STM32_Msg.size_frame_set() <= size:
+            encoder.frame_set(frame)
+        else:
+            for start, end, chs in plan:
+                if chs is None:
+                    encoder.block_set(start, frame[start:end+1])
+                else:
+                    for ch in chs: encoder.ch_set(ch, frame[ch])
+
+
+# ┌────────────────────────────────────────┐
+# │ Controller class                       │
+# └────────────────────────────────────────┘
+
+class DMX_Controller_STM32(DMX_Controller_STM32_Base):
+    def __init__(self, path, block_cmds: bool = False):
+        super().__init__(path, block_cmds)
+
         # ─────────── Threading related ────────── #
         
-        self._queue            = Queue(1)
+        self._pending_cond     = Condition()
+
         self._worker_started   = Event()
         self._worker_thread    = None # This object contains the Thread instance that is init. i nthe open function
-        self._written_event    = Event()
 
 
     # ┌────────────────────────────────────────┐
     # │ Controller hooks                       │
     # └────────────────────────────────────────┘
     
-    def _on_ch_set(self, ch: int, value: int):
-        self.log.debug(f"#{ch} = {value}")
-        self._req(DMX_STM32_Msg(
-            cmd    = DMX_STM32_Cmd.CH_SET,
-            value0 = ch,
-            value1 = value
-        ))
+    def _on_flush(self, frame: memoryview):
+        # Never blocks: the frame replaces the pending one if the worker
+        # has not picked it yet.
+        with self._pending_cond:
+            self._pending_set(frame)
+            self._pending_cond.notify()
 
     # ┌────────────────────────────────────────┐
     # │ Worker thread                          │
@@ -105,32 +412,47 @@ class DMX_Controller_STM32(DMX_Controller):
     def _worker(self):
         self.dev.open()
         try:
-            while self._worker_started.is_set():
-                buff = self._queue.get()
-
-                try:
-                    if buff is not None:
-                        t_start = time.time()
-                        self.dev.write(buff)
-                        t_end = time.time()
-                        self.log.debug(f"Write time: {(t_end-t_start)*1000}ms")
-                finally:
-                    self._written_event.set()
+            while True:
+                with self._pending_cond:
+                    while self._worker_started.is_set() and not self._pending:
+                        self._pending_cond.wait()
+
+                    if not self._pending:
+                        break # Stopped, and nothing left to write
+
+                    self._pending_take()
+
+                # Encoded without the lock, so that flush() never waits for it
+                self._write(self._work_encode())
 
         finally:
             self.dev.close()
             self._worker_started.clear()
 
 
+    def _write(self, data: memoryview):
+        if not len(data):
+            return
+
+        try:
+            t_start = time.time()
+            self.dev.write(data)
+            t_end = time.time()
+            self.log.debug(f"Write time: {(t_end-t_start)*1000}ms")
+
+            self._written()
+
+        except serial.SerialException as exc:
+            self._write_failed(exc)
+
+
     # ┌────────────────────────────────────────┐
     # │ Controller specific functions          │
     # └────────────────────────────────────────┘
 
-    def _ensure_written(self):
-        self._written_event.wait()
-
     def open(self):
         self.log.info("Open controller")
+        self._resync = True
         self._worker_started.set()
         self._worker_thread = Thread(target = self._worker)
         self._worker_thread.start()
@@ -138,20 +460,124 @@ class DMX_Controller_STM32(DMX_Controller):
     def close(self):
         self.log.info("Close controller")
 
-        if not self._queue.empty():
-            self._ensure_written()
+        # The worker writes the pending frame before leaving
+        with self._pending_cond:
+            self._worker_started.clear()
+            self._pending_cond.notify()
 
-        self._worker_started.clear()
-        self._queue.put(None)
         self._worker_thread.join()
-    
-    def _wrap(self, cmd):
-        return bytes([cmd[0] | 0x80]) + cmd[1:] + bytes([0xFF])
 
-    def _req(self, cmd):
-        self.buffer += self._wrap(cmd.to_bytes())
 
-    def flush(self):
-        # The following blocks if a write is in progress
-        self._queue.put(self.buffer)
-        self.buffer = bytes()
+# ┌────────────────────────────────────────┐
+# │ Asyncio controller class               │
+# └────────────────────────────────────────┘
+
+class DMX_Controller_STM32_Async(DMX_Controller_STM32_Base):
+    """
+    Same as DMX_Controller_STM32, but writes from the asyncio event loop using
+    a non-blocking file descriptor and writer callbacks instead of a thread.
+    Devices without file descriptor (like pyserial's loop:// URL) are written
+    directly, as their writes do not block.
+    """
+
+    def __init__(self, path, block_cmds: bool = False):
+        super().__init__(path, block_cmds)
+
+        self._loop = None
+        self._fd   = None
+        self._out  = None # Remaining data of the frame being written
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller hooks                       │
+    # └────────────────────────────────────────┘
+
+    def _on_flush(self, frame: memoryview):
+        self._pending_set(frame)
+        if self._out is None:
+            self._write_next()
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Writer callbacks                       │
+    # └────────────────────────────────────────┘
+
+    def _write_next(self):
+        while self._pending and self.dev.is_open:
+            self._pending_take()
+            self._out = self._work_encode()
+            if not len(self._out):
+                self._out = None
+                continue
+
+            if not self._write_some():
+                self._loop.add_writer(self._fd, self._on_writable)
+                return
+
+    def _on_writable(self):
+        if self._write_some():
+            self._loop.remove_writer(self._fd)
+            self._write_next()
+
+    def _write_some(self):
+        """
+        Writes as much as possible of the current frame. Returns True when the
+        frame is done, either written or dropped.
+        """
+
+        try:
+            if self._fd is None:
+                self.dev.write(self._out)
+                count = len(self._out)
+            else:
+                count = os.write(self._fd, self._out)
+
+        except BlockingIOError:
+            return False
+
+        except (OSError, serial.SerialException) as exc:
+            self._out = None
+            self._write_failed(exc)
+            return True
+
+        self._out = self._out[count:]
+        if len(self._out):
+            return False
+
+        self._out = None
+        self._written()
+        return True
+
+
+    # ┌────────────────────────────────────────┐
+    # │ Controller specific functions          │
+    # └────────────────────────────────────────┘
+
+    def open(self, loop: asyncio.AbstractEventLoop = None):
+        self.log.info("Open controller")
+        self._loop   = loop or asyncio.get_running_loop()
+        self._resync = True
+
+        self.dev.open()
+        try:
+            self._fd = self.dev.fileno()
+            os.set_blocking(self._fd, False)
+        except (AttributeError, io.UnsupportedOperation):
+            self._fd = None
+
+    def close(self):
+        """
+        Closes the device. A frame still being written is dropped.
+        """
+
+        self.log.info("Close controller")
+
+        if self._out is not None:
+            self._out = None
+            if self._fd is not None:
+                self._loop.remove_writer(self._fd)
+
+        self.dev.close()
+
+        self._fd   = None
+        self._loop = None
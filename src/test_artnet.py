@@ -0,0 +1,47 @@
+"""
+┌───────────────────────────────────────────────┐
+│ Test Art-Net controller with a local receiver │
+└───────────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import socket
+import time
+import logging
+
+from tests_dumb import MyFixture
+
+from pyshow.dmx.artnet import DMX_Controller_ArtNet
+
+logging.basicConfig(level=logging.DEBUG)
+
+receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+receiver.bind(("127.0.0.1", 0))
+receiver.settimeout(0.1)
+
+transport = DMX_Controller_ArtNet(host="127.0.0.1", port=receiver.getsockname()[1], universes=4, keepalive_s=0.5)
+fixtures  = [MyFixture(transport=transport, channel_start=1, universe=idx) for idx in range(4)]
+
+transport.open()
+try:
+    for i in range(20):
+        fixtures[i%4].interfaces["dimmer"].set(i*5.0)
+        transport.flush()
+        time.sleep(0.05)
+
+    while True:
+        try:
+            packet, addr = receiver.recvfrom(1024)
+        except socket.timeout:
+            break
+
+        net, subuni = packet[15], packet[14]
+        print(f"Seq {packet[12]:3d}, universe {(net<<8)|subuni}: {bytes(packet[18:22]).hex()}")
+
+    print(f"Sent: {transport.packets_sent}, dropped: {transport.packets_dropped}")
+
+finally:
+    transport.close()
+    receiver.close()
@@ -0,0 +1,76 @@
+"""
+┌──────────────────────────────────────────┐
+│ Crossfade between scenes on 30 universes │
+└──────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import time
+
+from tests_dumb            import MyFixture
+
+from pyshow.dmx.render     import Show_Renderer, DMX_Controller_Null
+from pyshow.dmx.merge      import Merge_Engine_DMX
+from pyshow.core.scenes    import Scene, Scene_Chooser
+from pyshow.core.curves    import CURVE_S
+from pyshow.core.functions import Function_Static, Function_Periodic_Expr
+
+
+UNIVERSES = 30
+
+
+def build():
+    transport = DMX_Controller_Null(UNIVERSES)
+    fixtures  = [
+        MyFixture(transport=transport, channel_start=ch, universe=univ)
+        for univ in range(UNIVERSES) for ch in range(0, 512, 4)
+    ]
+    merger    = Merge_Engine_DMX(transport)
+
+    chooser   = Scene_Chooser(merger=merger, fade_s=1.0, curve=CURVE_S, scenes={
+        "red": Scene(functions=[
+            Function_Static(interface=itf, target=v)
+            for fixt in fixtures for itf, v in (
+                (fixt.interfaces["dimmer"],  100.0),
+                (fixt.interfaces["color"].r, 1.0  ),
+            )
+        ]),
+
+        # Animated: the blend follows the animation while fading
+        "blue": Scene(functions=[
+            Function_Static(interface=fixt.interfaces["color"].b, target=1.0)
+            for fixt in fixtures
+        ] + [
+            Function_Periodic_Expr(interface=fixt.interfaces["dimmer"], period_s=0.1,
+                expr=lambda fkt, t: 50.0)
+            for fixt in fixtures
+        ]),
+    })
+
+    return transport, chooser
+
+
+if __name__ == "__main__":
+    transport, chooser = build()
+
+    ticks = []
+    def cue(tstamp):
+        ticks.append(time.perf_counter())
+        if tstamp == 1.0: chooser.choose("blue")
+
+    renderer = Show_Renderer(transport, [chooser], rate_hz=10.0, hooks=[cue])
+    chooser.choose("red", fade_s=0.0)
+
+    frames   = renderer.render(3.0)
+
+    for label, idx in (("red", 5), ("fading", 15), ("blue", 25)):
+        print(f"{label:8s}: {frames[idx][:4].tolist()} {frames[idx][-4:].tolist()}")
+
+    assert frames[ 5][:4].tolist() == [255, 255, 0,   0]
+    assert frames[15][:4].tolist() == [191, 128, 0, 128] # S curve is at 0.5 halfway
+    assert frames[25][:4].tolist() == [127,   0, 0, 255]
+
+    dt = [b-a for a, b in zip(ticks, ticks[1:])]
+    print(f"Mean tick: {sum(dt[:9])/9*1000:.2f}ms steady, {sum(dt[10:19])/9*1000:.2f}ms while fading")
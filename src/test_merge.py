@@ -0,0 +1,65 @@
+"""
+┌────────────────────────────────┐
+│ Flash a scene over another one │
+└────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+from tests_dumb            import MyFixture
+
+from pyshow.dmx.render     import Show_Renderer, DMX_Controller_Null
+from pyshow.dmx.merge      import Merge_Engine_DMX, Merge_Rule
+from pyshow.core.scenes    import Scene, Scene_Chooser
+from pyshow.core.functions import Function_Static
+
+
+def render():
+    transport = DMX_Controller_Null()
+    fixtures  = [MyFixture(transport=transport, channel_start=i*4) for i in range(2)]
+    merger    = Merge_Engine_DMX(transport)
+
+    # Dimmers are merged HTP, colors LTP (default)
+    merger.rule_set_name(fixtures, "dimmer", Merge_Rule.HTP)
+
+    chooser   = Scene_Chooser(merger=merger, scenes={
+        "look": Scene(functions=[
+            Function_Static(interface=fixtures[0].interfaces["dimmer"],  target=50.0),
+            Function_Static(interface=fixtures[1].interfaces["dimmer"],  target=50.0),
+            Function_Static(interface=fixtures[0].interfaces["color"].r, target=1.0),
+            Function_Static(interface=fixtures[0].interfaces["color"].b, target=0.0),
+        ]),
+
+        "flash": Scene(functions=[
+            Function_Static(interface=fixtures[0].interfaces["dimmer"],  target=100.0),
+            Function_Static(interface=fixtures[1].interfaces["dimmer"],  target=20.0),
+            Function_Static(interface=fixtures[0].interfaces["color"].b, target=1.0),
+            Function_Static(interface=fixtures[1].interfaces["color"].b, target=1.0),
+        ]),
+    })
+
+    def cue(tstamp):
+        if   tstamp == 1.0: chooser.flash_start("flash")
+        elif tstamp == 2.0: chooser.flash_end()
+
+    renderer  = Show_Renderer(transport, [chooser], rate_hz=10.0, hooks=[cue])
+    chooser.choose("look")
+
+    # Set directly, outside of all layers: kept by the merge
+    fixtures[1].interfaces["color"].g.set(1.0)
+
+    return renderer.render(3.0)
+
+
+if __name__ == "__main__":
+    frames = render()
+
+    for label, idx in (("look", 5), ("flash", 15), ("released", 25)):
+        print(f"{label:8s}: {frames[idx][:8].tolist()}")
+
+    # Look, flash over it with HTP dimmers and LTP colors, then back to look.
+    # Channels only driven by the flash go back to 0 when it is released.
+    assert list(frames[ 5][:8]) == [127, 255, 0,   0, 127, 0, 255,   0]
+    assert list(frames[15][:8]) == [255, 255, 0, 255, 127, 0, 255, 255]
+    assert list(frames[25][:8]) == [127, 255, 0,   0, 127, 0, 255,   0]
@@ -9,13 +9,13 @@
 
 import logging
 import asyncio
-import time
 
 from tests_dumb import (
     DumbController,
     MyFixture
 )
 
+from pyshow.core.runner    import Show_Runner
 from pyshow.core.scenes    import Scene
 from pyshow.core.functions import (
     Function_Static,
@@ -55,28 +55,14 @@ async def main():
 
     ctrl.event_register("/value", test_ctrl)
 
-    ctrl.start(asyncio.get_running_loop())
-    try:
-        period    = 0.01
-        last_exec = time.time()
-
-        fixture.interfaces["dimmer"].set(0)
-
-        scene.trigger()
-        while True:
-            tstamp = time.time()
+    runner = Show_Runner(rate_hz=100, items=[scene], transports=[transport], desks=[ctrl])
 
-            # Update current scene
-            await scene.update(tstamp)
+    fixture.interfaces["dimmer"].set(0)
+    scene.trigger()
 
-            # Sleep
-            curtime = time.time()
-            await asyncio.sleep(curtime-last_exec+period)
-            last_exec=time.time()
+    try:
+        await runner.run()
     except KeyboardInterrupt:
         pass
-    finally:
-        ctrl.stop()
-
 
 asyncio.run(main())
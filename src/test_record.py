@@ -0,0 +1,54 @@
+"""
+┌────────────────────────────────────────┐
+│ Record a rendered show, then replay it │
+└────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from test_render                import build
+
+from pyshow.core.clock          import Clock_Virtual
+from pyshow.dmx.render          import Show_Renderer, DMX_Controller_Null
+from pyshow.dmx.record          import DMX_Controller_Recorder, DMX_Playback
+
+
+path = os.path.join(tempfile.mkdtemp(), "show.rec")
+
+# ─────────── Bake generated show ────────── #
+
+transport, engine, items = build()
+clock                    = Clock_Virtual()
+recorder                 = DMX_Controller_Recorder(path, clock=clock)
+
+# Recorder is fed with the show transport frames
+def record(tstamp):
+    recorder.frame[:] = transport.frame
+    recorder.flush()
+
+renderer = Show_Renderer(transport, items, rate_hz=44.0, hooks=[engine.step, record], clock=clock)
+for item in items: item.trigger()
+
+recorder.open()
+frames   = renderer.render(60.0)
+recorder.close()
+
+print(f"Recorded {recorder.frames_recorded} frames, {os.path.getsize(path)} bytes")
+
+# ─────────────── Play it back ───────────── #
+
+output   = DMX_Controller_Null()
+playback = DMX_Playback(path, output)
+replay   = Show_Renderer(output, [playback], rate_hz=44.0)
+playback.trigger()
+
+t_start  = time.perf_counter()
+frames_2 = replay.render(60.0)
+print(f"Replayed in {time.perf_counter()-t_start:.3f}s, identical: {np.array_equal(frames, frames_2)}")
@@ -0,0 +1,73 @@
+"""
+┌─────────────────────────────────┐
+│ Render an hour of show, offline │
+└─────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from tests_dumb                 import MyFixture
+
+from pyshow.dmx.render          import Show_Renderer, DMX_Controller_Null
+from pyshow.dmx.fade_engine     import Fade_Engine_DMX
+from pyshow.core.scenes         import Scene, Scene_Sequence
+from pyshow.core.curves         import CURVE_S
+from pyshow.core.functions      import (
+    Function_Static,
+    Function_Fade,
+    Function_Delay,
+    Function_Periodic_Expr
+)
+
+
+def build():
+    transport = DMX_Controller_Null()
+    fixtures  = [MyFixture(transport=transport, channel_start=i*4) for i in range(32)]
+    engine    = Fade_Engine_DMX(transport)
+
+    dimmers   = [fixture.interfaces["dimmer"] for fixture in fixtures]
+    reds      = [fixture.interfaces["color"].r for fixture in fixtures]
+
+    sequence  = Scene_Sequence(steps=[
+        Scene(functions=[Function_Static(interface=itf, target=100.0) for itf in dimmers]),
+        Scene(functions=[Function_Delay(delay_s=1.0)]),
+        Scene(functions=[Function_Fade(interface=itf, target=0.0, fade_time_s=2.0, curve=CURVE_S, engine=engine) for itf in dimmers]),
+        Scene(functions=[Function_Fade(interface=itf, target=1.0, fade_time_s=0.5, engine=engine) for itf in reds]),
+        Scene(functions=[Function_Fade(interface=itf, target=0.0, fade_time_s=0.5, engine=engine) for itf in reds]),
+    ])
+
+    blue = Scene(functions=[
+        Function_Periodic_Expr(interface=fixtures[0].interfaces["color"].b, period_s=0.1,
+            expr=lambda fkt, t: (t % 1.0))
+    ])
+
+    return transport, engine, [sequence, blue]
+
+
+def render(duration_s: float, out=None):
+    transport, engine, items = build()
+    renderer = Show_Renderer(transport, items, rate_hz=44.0, hooks=[engine.step])
+
+    for item in items: item.trigger()
+
+    return renderer.render(duration_s, out)
+
+
+if __name__ == "__main__":
+    out     = sys.argv[1] if len(sys.argv) > 1 else None
+
+    t_start = time.perf_counter()
+    frames  = render(3600.0, out)
+    t_end   = time.perf_counter()
+
+    print(f"Rendered {len(frames)} frames in {t_end-t_start:.2f}s")
+
+    # Renders are reproducible
+    frames_2 = render(60.0)
+    print("First minute identical:", np.array_equal(frames[:len(frames_2)], frames_2))
@@ -0,0 +1,54 @@
+"""
+┌────────────────────────────────────────────┐
+│ Test sACN controller with a local receiver │
+└────────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import socket
+import time
+import logging
+
+from tests_dumb import MyFixture
+
+from pyshow.dmx.sacn import DMX_Controller_sACN
+
+logging.basicConfig(level=logging.DEBUG)
+
+receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+receiver.bind(("127.0.0.1", 0))
+receiver.settimeout(0.1)
+
+transport = DMX_Controller_sACN(hosts="127.0.0.1", port=receiver.getsockname()[1], universes=4, priority=150)
+fixtures  = [MyFixture(transport=transport, channel_start=1, universe=idx) for idx in range(4)]
+
+transport.open()
+try:
+    for i in range(8):
+        fixtures[i%4].interfaces["dimmer"].set(i*10.0)
+        transport.flush()
+        time.sleep(0.05)
+
+    transport.priority_set(50, universe=0)
+    transport.flush()
+
+finally:
+    transport.close()
+
+while True:
+    try:
+        packet, addr = receiver.recvfrom(1024)
+    except socket.timeout:
+        break
+
+    vector = int.from_bytes(packet[18:22], "big")
+    if vector == 0x04: # Data packet
+        universe = int.from_bytes(packet[113:115], "big")
+        print(f"Universe {universe}: seq {packet[111]:3d}, prio {packet[108]:3d}, options {packet[112]:02x}, data {bytes(packet[126:130]).hex()}")
+    else:
+        universes = [int.from_bytes(packet[i:i+2], "big") for i in range(120, len(packet), 2)]
+        print(f"Discovery: page {packet[118]}/{packet[119]}, universes {universes}")
+
+receiver.close()
@@ -8,13 +8,13 @@
 """
 
 import asyncio
-import time
 
 from tests_dumb import (
     DumbController,
     MyFixture
 )
 
+from pyshow.core.runner import Show_Runner
 from pyshow.core.scenes import (
     Scene,
     Scene_Chooser
@@ -62,31 +62,12 @@ async def main():
     ctrl.event_register(midi.note_on (0, 23, 0), lambda ev: chooser.flash_start("on"))
     ctrl.event_register(midi.note_off(0, 23, 0), lambda ev: chooser.flash_end()      )
 
-    ctrl.start(asyncio.get_running_loop())
-    try:
-        period      = 0.001
-        last_exec   = time.time()
-
-        timer_stuff = last_exec
-
-        chooser.choose("off")
+    runner = Show_Runner(rate_hz=1000, items=[chooser], transports=[transport], desks=[ctrl])
 
-        while True:
-            tstamp = time.time()
-            await chooser.update(tstamp)
-
-            # Choose scene
-            #if tstamp-timer_stuff > 5.0:
-            #    timer_stuff = tstamp
-            #    chooser.choose("on" if chooser.current() == "off" else "off")
-
-            # Sleep
-            curtime   = time.time()
-            await asyncio.sleep(curtime-last_exec+period)
-            last_exec = time.time()
+    chooser.choose("off")
+    try:
+        await runner.run()
     except KeyboardInterrupt:
         pass
-    finally:
-        ctrl.stop()
 
 asyncio.run(main())
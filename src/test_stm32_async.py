@@ -0,0 +1,64 @@
+"""
+┌──────────────────────────────────────────────┐
+│ Test asyncio STM32 controller against a pty  │
+└──────────────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import asyncio
+import os
+import logging
+
+from tests_dumb import MyFixture
+
+from pyshow.dmx.stm32dmx import (
+    DMX_Controller_STM32_Async,
+    DMX_STM32_Msg
+)
+
+def decode(data: bytes):
+    # Commands start with a byte having its MSB set, and end with 0xFF
+    for chunk in data.split(b"\xFF"):
+        if chunk:
+            yield DMX_STM32_Msg.from_bytes(chunk)
+
+
+async def main():
+    logging.basicConfig(level=logging.INFO)
+
+    master, slave = os.openpty()
+    os.set_blocking(master, False)
+
+    transport = DMX_Controller_STM32_Async(os.ttyname(slave))
+    fixture   = MyFixture(transport=transport, channel_start=1)
+
+    transport.open()
+    try:
+        received = bytearray()
+
+        for i in range(10):
+            fixture.interfaces["dimmer"].set(i*10.0)
+            fixture.interfaces["color"].r.set(i/10)
+            transport.flush()
+
+            await asyncio.sleep(0.02)
+
+            try:
+                received += os.read(master, 4096)
+            except BlockingIOError:
+                pass
+
+        for msg in decode(bytes(received)):
+            print(msg.cmd.name, msg.value0, msg.value1, len(msg.data))
+
+        print(f"Sent: {transport.frames_sent}, superseded: {transport.frames_superseded}, dropped: {transport.frames_dropped}")
+
+    finally:
+        transport.close()
+        os.close(master)
+        os.close(slave)
+
+
+asyncio.run(main())
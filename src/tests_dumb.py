@@ -10,7 +10,8 @@
 from pyshow.core.fixtures  import Fixture
 
 from pyshow.dmx.fixtures   import Fixture_DMX
-from pyshow.dmx.controller import DMX_Controller
+from pyshow.dmx.controller import DMX_Controller, DMX_UNIVERSE_SIZE
+from pyshow.dmx.render     import DMX_Controller_Null
 from pyshow.dmx.interfaces import (
     RangeValue_DMX_8Bits,
     RangeValue_DMX_16Bits
@@ -31,11 +32,12 @@ from typing      import Dict
 # └────────────────────────────────────────┘
 
 class DumbController(DMX_Controller):
-    def __init__(self):
-        super().__init__()
-
-    def _on_ch_set(self, ch: int, value: int):
-        print(f"Set ch #{ch:3d}: {value}")
+    def _on_universe_flush(self, idx, data):
+        # Called before the flushed copy of the universe is updated
+        start = idx*DMX_UNIVERSE_SIZE
+        for ch, v in enumerate(data):
+            if v != self._frame_flushed[start+ch]:
+                print(f"Set ch #{ch:3d}: {v}")
 
 
 # ┌────────────────────────────────────────┐
@@ -143,6 +145,28 @@ class MyMovingHead(Fixture_DMX):
 
     ))
 
+
+# ┌────────────────────────────────────────┐
+# │ Patch helper                           │
+# └────────────────────────────────────────┘
+
+def patch(count: int, fixture_cls = MyFixture, channels: int = 4, transport: DMX_Controller = None):
+    """
+    Patches count fixtures of channels channels each one after the other, on
+    as many universes as needed. Returns the transport, a DMX_Controller_Null
+    if not given, and the fixtures.
+    """
+
+    per_universe = DMX_UNIVERSE_SIZE // channels
+    transport    = transport or DMX_Controller_Null(universes=(count + per_universe-1)//per_universe)
+    fixtures     = [
+        fixture_cls(transport=transport, channel_start=(i%per_universe)*channels, universe=i//per_universe)
+        for i in range(count)
+    ]
+
+    return transport, fixtures
+
+
 if __name__ == "__main__":
     # Init transport
     transport = DumbController()
@@ -155,6 +179,7 @@ if __name__ == "__main__":
     fixture.interfaces["color"].r.set(0.5  )
     fixture.interfaces["color"].g.set(0.23 )
     fixture.interfaces["color"].b.set(0.8  )
+    transport.flush()
 
     print("Serialize fixture: ")
     pprint(asdict(fixture))
@@ -21,6 +21,7 @@ from pyshow.core.functions import (
 )
 
 from pyshow.core.interfaces import RangeValue
+from pyshow.core.clock      import CLOCK_MONOTONIC
 
 from tests_dumb import (
     DumbController,
@@ -104,12 +105,13 @@ async def main():
         for fkt in itertools.chain(functions, fade_fkts): fkt.trigger()
 
         while True:
-            tstamp = time.time()
+            tstamp = CLOCK_MONOTONIC.now()
 
             # Update all functions (in parallel)
             await asyncio.gather(*[
                 fkt.update(tstamp) for fkt in functions
             ] + [fade_fkts[fade_idx].update(tstamp)])
+            transport.flush()
 
             # Change fade function if finished
             if fade_fkts[fade_idx].finished:
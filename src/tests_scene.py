@@ -8,14 +8,14 @@
 """
 
 import asyncio
-import time
 
 from tests_dumb import (
     DumbController,
     MyFixture
 )
 
-from pyshow.core.scenes    import Scene
+from pyshow.core.runner    import Show_Runner
+from pyshow.core.scenes    import Scene, Scene_Sequence
 from pyshow.core.functions import (
     Function_Static,
     Function_Animation,
@@ -55,33 +55,15 @@ async def main():
         )
     ])
 
-    try:
-        period    = 0.01
-        last_exec = time.time()
-
-        current_scene = scene_1
-
-
-        fixture.interfaces["dimmer"].set(0)
+    # Alternate between both scenes
+    sequence = Scene_Sequence(steps=[scene_1, scene_2])
+    runner   = Show_Runner(rate_hz=100, items=[sequence], transports=[transport])
 
-        while True:
-            # Initial scene trigger
-            if current_scene.finished():
-                current_scene.trigger()
+    fixture.interfaces["dimmer"].set(0)
+    sequence.trigger()
 
-            tstamp = time.time()
-
-            # Update current scene
-            await current_scene.update(tstamp)
-
-            # Change scene ,
-            if current_scene.finished():
-                current_scene = scene_2 if current_scene == scene_1 else scene_1
-
-            # Sleep
-            curtime = time.time()
-            await asyncio.sleep(curtime-last_exec+period)
-            last_exec=time.time()
+    try:
+        await runner.run()
     except KeyboardInterrupt:
         pass
 
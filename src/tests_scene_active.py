@@ -0,0 +1,85 @@
+"""
+┌──────────────────────────────────────┐
+│ Active function tracking of a scene  │
+└──────────────────────────────────────┘
+
+ Florian Dupeyron
+ July 2022
+"""
+
+import asyncio
+
+from pyshow.core.clock      import Clock_Virtual
+from pyshow.core.scenes     import Scene
+from pyshow.core.functions  import Function, Function_Animation
+from pyshow.core.interfaces import RangeValue
+
+
+# ┌────────────────────────────────────────┐
+# │ Test functions                         │
+# └────────────────────────────────────────┘
+
+class Function_Ramp(Function_Animation):
+    """
+    Animation following the clock, never triggered.
+    """
+
+    def _compute_value(self, timestamp: float):
+        return min(timestamp, self.interface.max)
+
+
+class Function_Once(Function):
+    """
+    Sets its target once per trigger, overriding trigger() without calling
+    Function.trigger().
+    """
+
+    def __init__(self, interface: RangeValue, target: float):
+        super().__init__(interface)
+        self.target  = target
+        self.pending = False
+
+    def trigger(self):
+        self.pending = True
+
+    def _due(self, timestamp: float):
+        return self.pending
+
+    def _apply(self, v, timestamp: float):
+        self.interface.set(self.target)
+        self.pending = False
+
+
+# ┌────────────────────────────────────────┐
+# │ Test program                           │
+# └────────────────────────────────────────┘
+
+async def main():
+    clock  = Clock_Virtual()
+    ramp   = RangeValue(min=0.0, max=10.0)
+    once   = RangeValue(min=0.0, max=10.0)
+
+    scene  = Scene([Function_Ramp(ramp), Function_Once(once, 5.0)], clock=clock)
+
+    # Never triggered animation is played
+    for i in range(3):
+        clock.advance(1.0)
+        await scene.update(clock.now())
+
+    assert ramp.get() == 3.0
+    assert once.get() == 0.0
+
+    # Trigger override without super() is updated once, then left aside
+    scene.trigger()
+    clock.advance(1.0)
+    await scene.update(clock.now())
+
+    assert ramp.get() == 4.0
+    assert once.get() == 5.0
+    assert list(scene._active_sync) == [scene.functions[0]]
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,13 +8,13 @@
 """
 
 import asyncio
-import time
 
 from tests_dumb import (
     DumbController,
     MyFixture
 )
 
+from pyshow.core.runner import Show_Runner
 from pyshow.core.scenes import (
     Scene,
     Scene_Chooser
@@ -52,27 +52,23 @@ async def main():
         }
     )
 
-    try:
-        period      = 0.01
-        last_exec   = time.time()
-
-        timer_stuff = last_exec
+    timer_stuff = None
 
-        chooser.choose("off")
+    def switch(tstamp):
+        nonlocal timer_stuff
 
-        while True:
-            tstamp = time.time()
-            await chooser.update(tstamp)
+        # Choose scene
+        if timer_stuff is None:
+            timer_stuff = tstamp
+        elif tstamp-timer_stuff > 5.0:
+            timer_stuff = tstamp
+            chooser.choose("on" if chooser.current() == "off" else "off")
 
-            # Choose scene
-            if tstamp-timer_stuff > 5.0:
-                timer_stuff = tstamp
-                chooser.choose("on" if chooser.current() == "off" else "off")
+    runner = Show_Runner(rate_hz=100, items=[chooser], transports=[transport], hooks=[switch])
 
-            # Sleep
-            curtime   = time.time()
-            await asyncio.sleep(curtime-last_exec+period)
-            last_exec = time.time()
+    chooser.choose("off")
+    try:
+        await runner.run()
     except KeyboardInterrupt:
         pass
 
@@ -8,7 +8,6 @@
 """
 
 import asyncio
-import time
 import logging
 
 from tests_dumb import (
@@ -16,7 +15,8 @@ from tests_dumb import (
     MyFixture
 )
 
-from pyshow.core.scenes    import Scene
+from pyshow.core.runner    import Show_Runner
+from pyshow.core.scenes    import Scene, Scene_Sequence
 from pyshow.core.functions import (
     Function_Static,
     Function_Animation,
@@ -71,38 +71,16 @@ async def main():
         )
     ])
 
-    transport.open()
-    try:
-        period    = 0.015
-        last_exec = time.time()
-
-        current_scene = scene_1
-
-
-        fixture.interfaces["dimmer"].set(0)
-        #fixture.interfaces["gobo"].set("rocks")
-
-        while True:
-            # Initial scene trigger
-            if current_scene.finished():
-                current_scene.trigger()
+    # Alternate between both scenes
+    sequence = Scene_Sequence(steps=[scene_1, scene_2])
+    runner   = Show_Runner(rate_hz=66, items=[sequence], transports=[transport])
 
-            tstamp = time.time()
+    fixture.interfaces["dimmer"].set(0)
+    sequence.trigger()
 
-            # Update current scene
-            await current_scene.update(tstamp)
-
-            # Change scene ,
-            if current_scene.finished():
-                current_scene = scene_2 if current_scene == scene_1 else scene_1
-
-            # flush controller
-            transport.flush()
-
-            # Sleep
-            curtime = time.time()
-            await asyncio.sleep(curtime-last_exec+period)
-            last_exec=time.time()
+    transport.open()
+    try:
+        await runner.run()
     except KeyboardInterrupt:
         pass
     finally:
@@ -8,13 +8,13 @@
 """
 
 import asyncio
-import time
 
 from tests_dumb import (
     DumbController,
     MyFixture
 )
 
+from pyshow.core.runner    import Show_Runner
 from pyshow.core.scenes    import Scene, Scene_Sequence
 from pyshow.core.functions import (
     Function_Static,
@@ -36,26 +36,17 @@ async def main():
         Scene(functions=[Function_Delay (delay_s   = 1)                                         ]),
     ])
 
-    try:
-        period    = 0.01
-        last_exec = time.time()
-
-        while True:
-            # Initial scene trigger
-            if scene.finished():
-                scene.trigger()
-
-            tstamp = time.time()
+    def restart(tstamp):
+        # Loop the sequence
+        if scene.finished():
+            scene.trigger()
 
-            # Update current scene
-            await scene.update(tstamp)
+    runner = Show_Runner(rate_hz=100, items=[scene], transports=[transport], hooks=[restart])
 
-            # Sleep
-            curtime = time.time()
-            await asyncio.sleep(curtime-last_exec+period)
-            last_exec=time.time()
+    scene.trigger()
+    try:
+        await runner.run()
     except KeyboardInterrupt:
         pass
 
-
 asyncio.run(main())